@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Geradores de dados sintéticos com o mesmo formato (colunas, tipos e faixas de valores)
+# dos quatro CSVs do repositório, em qualquer número de linhas (de 10^3 a 10^7)
+#
+# Cada gerador é determinístico para um dado "seed", então o mesmo tamanho
+# sempre produz o mesmo arquivo e os resultados são comparáveis entre commits
+
+def adult(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def pick(options, p=None):
+        return rng.choice(options, n, p=p)
+
+    return pd.DataFrame({
+        'age': rng.integers(17, 91, n),
+        'workclass': pick(['Private', 'Self-emp-not-inc', 'Local-gov', 'State-gov', '?'], [.7, .08, .07, .1, .05]),
+        'fnlwgt': rng.integers(12_285, 1_484_705, n),
+        'education': pick(['HS-grad', 'Some-college', 'Bachelors', 'Masters', 'Assoc-voc', '11th', 'Doctorate'],
+                          [.32, .22, .17, .06, .05, .14, .04]),
+        'education-num': rng.integers(1, 17, n),
+        'marital-status': pick(['Married-civ-spouse', 'Never-married', 'Divorced', 'Widowed'], [.46, .33, .14, .07]),
+        'occupation': pick(['Prof-specialty', 'Craft-repair', 'Exec-managerial', 'Adm-clerical', 'Sales', '?'],
+                           [.2, .18, .18, .16, .16, .12]),
+        'relationship': pick(['Husband', 'Not-in-family', 'Own-child', 'Wife', 'Unmarried'], [.4, .26, .16, .05, .13]),
+        'race': pick(['White', 'Black', 'Asian-Pac-Islander', 'Amer-Indian-Eskimo', 'Other'], [.85, .1, .03, .01, .01]),
+        'sex': pick(['Male', 'Female'], [.67, .33]),
+        'capital-gain': np.where(rng.random(n) < .08, rng.integers(100, 99_999, n), 0),
+        'capital-loss': np.where(rng.random(n) < .05, rng.integers(100, 4_356, n), 0),
+        'hours-per-week': rng.integers(1, 100, n),
+        'native-country': pick(['United-States', 'Mexico', '?', 'Philippines', 'Germany', 'India', 'Canada', 'Iran'],
+                               [.9, .02, .02, .01, .01, .02, .01, .01]),
+        'salary': pick(['<=50K', '>50K'], [.76, .24])
+    })
+
+
+def medical(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ap_hi = rng.normal(127, 17, n).round().astype(np.int32)
+    ap_lo = rng.normal(81, 10, n).round().astype(np.int32)
+    # Alguns registros com pressão diastólica maior que a sistólica (removidos na limpeza)
+    swapped = rng.random(n) < .02
+    ap_hi[swapped], ap_lo[swapped] = ap_lo[swapped], ap_hi[swapped]
+
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'age': rng.integers(10_798, 23_713, n),
+        'sex': rng.choice([1, 2], n, p=[.65, .35]),
+        'height': rng.normal(164, 8, n).round().astype(np.int32),
+        'weight': rng.normal(74, 14, n).round(1),
+        'ap_hi': ap_hi,
+        'ap_lo': ap_lo,
+        'cholesterol': rng.choice([1, 2, 3], n, p=[.75, .14, .11]),
+        'gluc': rng.choice([1, 2, 3], n, p=[.85, .07, .08]),
+        'smoke': (rng.random(n) < .09).astype(np.int8),
+        'alco': (rng.random(n) < .05).astype(np.int8),
+        'active': (rng.random(n) < .8).astype(np.int8),
+        'cardio': (rng.random(n) < .5).astype(np.int8)
+    })
+
+
+def page_views(n, seed=0):
+    # Sempre o mesmo período do arquivo original (mai/2016 a dez/2019), com mais
+    # medições por dia quanto maior o número de linhas
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2016-05-09', '2019-12-03 23:59:59', periods=n)
+    days = (dates - dates[0]).days.to_numpy()
+    trend = 15_000 + 40 * days + 8_000 * np.sin(2 * np.pi * days / 365)
+    values = (trend * rng.lognormal(0, .25, n)).astype(np.int64)
+    return pd.DataFrame({'date': dates, 'value': values})
+
+
+def sea_level(n, seed=0):
+    # Anos fracionários entre 1880 e 2023; a série CSIRO termina em 2013
+    # e a série NOAA só começa em 1993, como no arquivo original
+    rng = np.random.default_rng(seed)
+    years = np.linspace(1880, 2023, n)
+    level = .063 * (years - 1880) - .5 + np.cumsum(rng.normal(0, .2 / np.sqrt(n / 144), n))
+    error = .05 + .9 * np.exp(-(years - 1880) / 60)
+    csiro = np.where(years <= 2013, level, np.nan)
+    noaa = np.where(years >= 1993, level + rng.normal(0, .05, n), np.nan)
+    return pd.DataFrame({
+        'Year': years,
+        'CSIRO Adjusted Sea Level': csiro,
+        'Lower Error Bound': csiro - error,
+        'Upper Error Bound': csiro + error,
+        'NOAA Adjusted Sea Level': noaa
+    })
+
+
+# Nome do arquivo que cada módulo espera → gerador
+DATASETS = {
+    'adult': ('adult.csv', adult),
+    'medical': ('medical_examination.csv', medical),
+    'page_views': ('fcc-forum-pageviews.csv', page_views),
+    'sea_level': ('epa-sea-level.csv', sea_level)
+}
+
+
+def dataset_dir(data_dir, rows):
+    # Uma pasta por tamanho, com os arquivos nos nomes originais: os módulos que
+    # leem caminhos relativos encontram os dados sintéticos sem nenhuma alteração
+    return os.path.join(data_dir, str(rows))
+
+
+def write(dataset, rows, data_dir, seed=0):
+    # Gera o CSV (se ainda não existir) e devolve o caminho
+    if dataset not in DATASETS:
+        raise ValueError(f"Conjunto de dados desconhecido: {dataset}")
+    name, generate = DATASETS[dataset]
+    folder = dataset_dir(data_dir, rows)
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        generate(rows, seed).to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    return path
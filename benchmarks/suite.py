@@ -0,0 +1,221 @@
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from generators import dataset_dir, write
+
+# Suíte de benchmarks de todos os pontos de entrada dos projetos
+#
+# Para cada caso e cada tamanho de dados:
+# - o CSV sintético é gerado uma única vez (generators.py), fora da medição
+# - cada repetição roda em um processo novo, como um script de verdade: sem
+#   caches em memória (lru_cache) de rodadas anteriores, e os "main.py" de
+#   projetos diferentes nunca se misturam
+# - nos casos que leem um CSV, uma rodada "fria" começa sem o cache colunar
+#   .npcache do arquivo (common/dataset_registry.py): mede a interpretação do CSV
+#   e a gravação do cache, o custo real da primeira execução (wall_cold)
+# - uma rodada com tracemalloc mede o pico de memória alocada; o tempo dela é
+#   descartado, pois o tracemalloc deixa tudo mais lento
+# - as rodadas seguintes, já com o cache pronto, medem tempo de relógio, tempo
+#   de CPU e o aumento do pico de memória residente (RSS) durante a chamada
+#
+# Os resultados vão para um JSON (um por commit), e --compare aponta regressões
+# entre dois arquivos de resultados
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Caso → (pasta do projeto, módulo, função, conjunto de dados)
+# Casos sem conjunto de dados não dependem do tamanho e rodam uma vez só
+CASES = {
+    'calculate': ('mean_variance_std', 'main', 'calculate', None),
+    'calculate_batch': ('mean_variance_std', 'main', 'calculate_batch', 'matrices'),
+    'calculate_demographic_data': ('demographic_data_analyzer', 'main', 'calculate_demographic_data', 'adult'),
+    'draw_cat_plot': ('medical_data_visualizer', 'medical_data_visualizer', 'draw_cat_plot', 'medical'),
+    'draw_heat_map': ('medical_data_visualizer', 'medical_data_visualizer', 'draw_heat_map', 'medical'),
+    'draw_line_plot': ('page_view_time_series_visualizer', 'time_series_visualizer', 'draw_line_plot', 'page_views'),
+    'draw_bar_plot': ('page_view_time_series_visualizer', 'time_series_visualizer', 'draw_bar_plot', 'page_views'),
+    'draw_box_plot': ('page_view_time_series_visualizer', 'time_series_visualizer', 'draw_box_plot', 'page_views'),
+    'draw_plot': ('sea_level_predictor', 'sea_level_predictor', 'draw_plot', 'sea_level')
+}
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DATA_DIR = os.path.join(HERE, '.data')
+RESULTS_DIR = os.path.join(HERE, 'results')
+
+
+# 1. Uma medição (executada em um processo novo)
+
+def _arguments(case, rows):
+    # Argumentos de cada função; dados em memória são criados fora da medição
+    if case == 'calculate':
+        return [list(range(9))]
+    if case == 'calculate_batch':
+        return [np.random.default_rng(0).random((rows, 9))]
+    if case == 'calculate_demographic_data':
+        return ['adult.csv']
+    return []
+
+
+def measure(case, rows, data_dir, trace):
+    folder, module_name, func_name, dataset = CASES[case]
+    sys.path.insert(0, os.path.join(ROOT, folder))
+    if dataset not in (None, 'matrices'):
+        os.chdir(dataset_dir(data_dir, rows))
+
+    func = getattr(importlib.import_module(module_name), func_name)
+    args = _arguments(case, rows)
+
+    # Funções muito rápidas são chamadas várias vezes, e o tempo é dividido
+    number = 1000 if dataset is None else 1
+
+    if trace:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start, cpu_start = time.perf_counter(), time.process_time()
+    for _ in range(number):
+        func(*args)
+    wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = {'wall': wall / number, 'cpu': cpu / number, 'rss_growth': (rss_after - rss_before) * 1024}
+    if trace:
+        result['peak_allocated'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def _clear_cache(path):
+    # Remove o cache colunar do CSV (mesma pasta e nome usados por common/dataset_registry.py)
+    folder, name = os.path.split(path)
+    shutil.rmtree(os.path.join(folder, '.' + os.path.splitext(name)[0] + '.npcache'), ignore_errors=True)
+
+
+def _run_isolated(case, rows, data_dir, trace=False):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', case, str(rows), '--data-dir', data_dir]
+    if trace:
+        command.append('--trace')
+    env = dict(os.environ, MPLBACKEND='Agg')
+    output = subprocess.run(command, capture_output=True, text=True, env=env)
+    if output.returncode != 0:
+        raise RuntimeError(f"{case} ({rows} linhas) falhou:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+# 2. Suíte completa
+
+def _commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain'], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def run_suite(cases, sizes, repeat=3, data_dir=DATA_DIR):
+    commit, dirty = _commit()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'results': []
+    }
+
+    for case in cases:
+        dataset = CASES[case][3]
+        for rows in ([None] if dataset is None else sizes):
+            cold = None
+            if dataset not in (None, 'matrices'):
+                _clear_cache(write(dataset, rows, data_dir))
+                cold = _run_isolated(case, rows, data_dir)
+
+            traced = _run_isolated(case, rows, data_dir, trace=True)
+            runs = [_run_isolated(case, rows, data_dir) for _ in range(repeat)]
+            wall = sorted(run['wall'] for run in runs)
+            cpu = sorted(run['cpu'] for run in runs)
+
+            result = {
+                'case': case,
+                'rows': rows,
+                'wall_min': wall[0],
+                'wall_median': wall[len(wall) // 2],
+                'wall_cold': cold['wall'] if cold else None,
+                'cpu_median': cpu[len(cpu) // 2],
+                'peak_allocated': traced['peak_allocated'],
+                'rss_growth': max(run['rss_growth'] for run in runs)
+            }
+            report['results'].append(result)
+            print(f"{case:<28} {rows or '-':>10} | {result['wall_median']:9.4f}s"
+                  f" | CPU {result['cpu_median']:9.4f}s | pico {result['peak_allocated'] / 1024 ** 2:9.1f} MiB"
+                  + (f" | frio {cold['wall']:9.4f}s" if cold else ''), flush=True)
+    return report
+
+
+# 3. Comparação entre dois arquivos de resultados
+
+def compare(old_path, new_path, threshold=1.2):
+    # Mostra a razão novo/antigo da mediana de tempo, do tempo sem cache (quando os
+    # dois arquivos o têm) e do pico de memória de cada caso
+    # Devolve os casos em que alguma das razões passa de "threshold"
+    with open(old_path) as f:
+        old = {(r['case'], r['rows']): r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = {(r['case'], r['rows']): r for r in json.load(f)['results']}
+
+    regressions = []
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[0], k[1] or 0)):
+        time_ratio = new[key]['wall_median'] / old[key]['wall_median']
+        memory_ratio = new[key]['peak_allocated'] / max(old[key]['peak_allocated'], 1)
+        cold_ratio = None
+        if old[key].get('wall_cold') and new[key].get('wall_cold'):
+            cold_ratio = new[key]['wall_cold'] / old[key]['wall_cold']
+        flag = time_ratio > threshold or memory_ratio > threshold or (cold_ratio or 0) > threshold
+        if flag:
+            regressions.append(key)
+        print(f"{key[0]:<28} {key[1] or '-':>10} | tempo {time_ratio:6.2f}x"
+              + (f" | frio {cold_ratio:6.2f}x" if cold_ratio else '')
+              + f" | memória {memory_ratio:6.2f}x" + (' ← regressão' if flag else ''))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks de todos os projetos')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', help='arquivo JSON (padrão: results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('ANTIGO', 'NOVO'))
+    parser.add_argument('--threshold', type=float, default=1.2)
+    parser.add_argument('--worker', nargs=2, metavar=('CASO', 'LINHAS'), help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.worker:
+        case, rows = options.worker
+        print(json.dumps(measure(case, None if rows == 'None' else int(rows), options.data_dir, options.trace)))
+    elif options.compare:
+        sys.exit(1 if compare(*options.compare, options.threshold) else 0)
+    else:
+        report = run_suite(options.cases, options.sizes, options.repeat, options.data_dir)
+        output = options.output or os.path.join(RESULTS_DIR, f"{(report['commit'] or 'sem-commit')[:12]}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados salvos em {output}")
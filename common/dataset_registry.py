@@ -0,0 +1,235 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from instrumentation import stage
+
+
+# Registro dos conjuntos de dados dos projetos, com cache colunar mapeado em memória
+#
+# Cada CSV é convertido uma única vez em um arquivo .npy por coluna, com os tipos
+# do esquema abaixo, em uma pasta ao lado dele:
+#     medical_examination.csv -> .medical_examination.npcache/<versão>/
+# As leituras seguintes abrem os .npy com np.load(mmap_mode='r'): nada é
+# interpretado nem copiado, e as páginas do arquivo ficam no cache do sistema
+# operacional, compartilhadas entre todos os processos que leem o mesmo conjunto
+# (os processos de um pool não guardam cada um a sua cópia dos dados)
+#
+# A versão do cache combina tamanho e data de modificação do CSV e o esquema:
+# se qualquer um deles mudar, o cache é refeito. Cada versão é gravada em uma
+# pasta temporária e renomeada no fim, para que um processo nunca leia um cache
+# gravado pela metade por outro
+#
+# Tipos do esquema:
+# - tipos do NumPy ('int8', 'float32', ...): a coluna é salva como está
+# - 'str': codificada por dicionário — códigos inteiros (na ordem de aparição)
+#   mais um .npy com o texto de cada código; no DataFrame vira uma categoria
+# - 'datetime': datas interpretadas pelo pandas (parse_dates)
+#
+# Só o numpy é importado aqui: o pandas é importado apenas para converter um CSV
+# ou montar um DataFrame, para não pesar em sea_level_predictor/prediction.py
+
+# Pasta raiz dos projetos (onde ficam os CSVs originais)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Conjunto → (arquivo CSV, esquema: coluna → tipo)
+DATASETS = {
+    # Tipos compactos para cada coluna do exame médico
+    # - Flags 0/1 e códigos de categoria cabem em int8
+    # - Pressões, altura e idade (em dias) cabem em int16
+    # - Peso tem casas decimais, então usa float32
+    'medical': ('medical_examination.csv', {
+        'id': 'int32',
+        'age': 'int16',
+        'sex': 'int8',
+        'height': 'int16',
+        'weight': 'float32',
+        'ap_hi': 'int16',
+        'ap_lo': 'int16',
+        'cholesterol': 'int8',
+        'gluc': 'int8',
+        'smoke': 'int8',
+        'alco': 'int8',
+        'active': 'int8',
+        'cardio': 'int8'
+    }),
+    'page_views': ('fcc-forum-pageviews.csv', {
+        'date': 'datetime',
+        'value': 'int64'
+    }),
+    # Medições ausentes (campos vazios) viram NaN; anos podem ser fracionários
+    'sea_level': ('epa-sea-level.csv', {
+        'Year': 'float64',
+        'CSIRO Adjusted Sea Level': 'float64',
+        'Lower Error Bound': 'float64',
+        'Upper Error Bound': 'float64',
+        'NOAA Adjusted Sea Level': 'float64'
+    }),
+    # Apenas as colunas usadas pelas métricas do demographic_data_analyzer: as demais
+    # (workclass, fnlwgt, capital-gain, ...) não são exigidas no CSV nem guardadas no cache
+    'adult': ('adult.csv', {
+        'age': 'int64',
+        'education': 'str',
+        'occupation': 'str',
+        'race': 'str',
+        'sex': 'str',
+        'hours-per-week': 'int64',
+        'native-country': 'str',
+        'salary': 'str'
+    })
+}
+
+
+# 1. Localização do arquivo
+
+def locate(path):
+    # Caminhos relativos são procurados primeiro no diretório atual e depois na
+    # pasta raiz dos projetos, para que os módulos funcionem de qualquer diretório
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    candidate = os.path.join(ROOT, path)
+    return candidate if os.path.exists(candidate) else path
+
+
+def file_version(path):
+    # (caminho absoluto, tamanho, data de modificação) do arquivo: usado como chave
+    # das memorizações em memória (lru_cache) dos módulos, para que um CSV alterado
+    # seja lido de novo em vez de devolver os dados da versão anterior
+    path = os.path.abspath(locate(path))
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime_ns
+
+
+def _schema(name):
+    if name not in DATASETS:
+        raise ValueError(f"Conjunto de dados desconhecido: {name}")
+    return DATASETS[name][1]
+
+
+# 2. Conversão do CSV (uma única vez por versão do arquivo)
+
+def _version_dir(path, schema):
+    # medical_examination.csv -> .medical_examination.npcache/<tamanho>-<data>-<esquema>
+    folder, name = os.path.split(os.path.abspath(path))
+    stat = os.stat(path)
+    digest = hashlib.blake2b(json.dumps(schema).encode(), digest_size=6).hexdigest()
+    root = os.path.join(folder, '.' + os.path.splitext(name)[0] + '.npcache')
+    return root, f'{stat.st_size}-{stat.st_mtime_ns}-{digest}'
+
+
+def _read_csv(path, schema):
+    # Lê o CSV com os tipos do esquema e devolve coluna → array
+    # (colunas 'str' → (códigos, textos))
+    import pandas as pd
+
+    with open(path, newline='') as f:
+        header = next(csv.reader(f), [])
+    missing = [col for col in schema if col not in header]
+    if missing:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(missing)}")
+
+    dates = [col for col, kind in schema.items() if kind == 'datetime']
+    df = pd.read_csv(path, usecols=list(schema), parse_dates=dates,
+                     dtype={col: kind for col, kind in schema.items() if kind not in ('str', 'datetime')})
+
+    columns = {}
+    for col, kind in schema.items():
+        if kind == 'str':
+            codes, labels = pd.factorize(df[col])
+            columns[col] = (codes.astype(np.min_scalar_type(-len(labels) - 1)), np.asarray(labels, dtype=str))
+        else:
+            columns[col] = df[col].to_numpy()
+    return columns
+
+
+def _write_cache(root, version, columns):
+    # Grava tudo em uma pasta temporária e a renomeia para a versão final;
+    # se outro processo já gravou a mesma versão, a cópia deste é descartada
+    try:
+        os.makedirs(root, exist_ok=True)
+        temporary = tempfile.mkdtemp(prefix='.tmp-', dir=root)
+    except OSError:
+        return False
+    try:
+        for i, values in enumerate(columns.values()):
+            if isinstance(values, tuple):
+                np.save(os.path.join(temporary, f'{i}.npy'), values[0])
+                np.save(os.path.join(temporary, f'{i}.labels.npy'), values[1])
+            else:
+                np.save(os.path.join(temporary, f'{i}.npy'), values)
+        os.rename(temporary, os.path.join(root, version))
+    except OSError:
+        shutil.rmtree(temporary, ignore_errors=True)
+        return os.path.isdir(os.path.join(root, version))
+
+    # Remove as versões antigas (quem ainda as tiver abertas continua lendo normalmente)
+    # e arquivos soltos do formato anterior do cache (um .npy por coluna na própria pasta)
+    for entry in os.listdir(root):
+        if entry == version or entry.startswith('.tmp-'):
+            continue
+        entry = os.path.join(root, entry)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+    return True
+
+
+def _read_cache(folder, schema):
+    try:
+        columns = {}
+        for i, (col, kind) in enumerate(schema.items()):
+            values = np.load(os.path.join(folder, f'{i}.npy'), mmap_mode='r')
+            if kind == 'str':
+                values = (values, np.load(os.path.join(folder, f'{i}.labels.npy')))
+            columns[col] = values
+        return columns
+    except (OSError, ValueError):
+        return None
+
+
+# 3. Leitura
+
+def arrays(name, path=None, cache=True):
+    # Colunas do conjunto "name" (lidas de "path", ou do arquivo padrão do registro)
+    # como arrays NumPy somente leitura mapeados do cache; colunas 'str' vêm como
+    # (códigos, textos). Com cache=False, o CSV é sempre lido e nada é gravado
+    schema = _schema(name)
+    path = locate(path or DATASETS[name][0])
+    if not cache:
+        with stage('dataset_registry.read_csv', dataset=name):
+            return _read_csv(path, schema)
+
+    root, version = _version_dir(path, schema)
+    folder = os.path.join(root, version)
+    with stage('dataset_registry.read_cache', dataset=name):
+        columns = _read_cache(folder, schema) if os.path.isdir(folder) else None
+    if columns is None:
+        with stage('dataset_registry.convert', dataset=name):
+            columns = _read_csv(path, schema)
+            if _write_cache(root, version, columns):
+                columns = _read_cache(folder, schema) or columns
+    return columns
+
+
+def frame(name, path=None, cache=True, index=None):
+    # DataFrame do pandas sobre as mesmas colunas, sem copiá-las
+    # (colunas 'str' viram categorias); "index" define a coluna usada como índice
+    import pandas as pd
+
+    data = {}
+    for col, values in arrays(name, path, cache).items():
+        if isinstance(values, tuple):
+            codes, labels = values
+            values = pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype='str'))
+        data[col] = values
+    df = pd.DataFrame(data, copy=False)
+    return df.set_index(index) if index is not None else df
@@ -0,0 +1,107 @@
+import collections
+import io
+
+
+# Exportação rápida de PNG com reaproveitamento de figuras
+#
+# Montar uma figura do zero (eixos, títulos, rótulos, legendas, barra de cores,
+# máscara do mapa de calor...) custa boa parte do tempo de cada gráfico. Aqui cada
+# gráfico é um "template": a figura é montada uma única vez e, nos relatórios
+# seguintes, só os artistas de dados (barras, linhas, pontos, células) são
+# atualizados com o novo conjunto de dados
+#
+# As figuras são orientadas a objetos (sem pyplot), então não ficam presas no
+# registro global do matplotlib: o pool guarda um número limitado de templates
+# e limpa os que saem dele, e a memória fica estável em milhares de renderizações
+#
+# O matplotlib só é importado quando a primeira figura é criada, para que módulos
+# com importação preguiçosa (como sea_level_predictor.py) possam usar o pool
+
+DEFAULT_COMPRESS_LEVEL = 6  # Mesmo nível padrão do savefig (zlib 0-9: 0 = sem compressão)
+
+
+def png_bytes(fig, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    # PNG em memória (bytes) de uma figura
+    # - dpi: resolução de saída (None = a da própria figura)
+    # - compress_level: 0-9; níveis baixos gravam mais rápido e geram arquivos maiores
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi or 'figure', pil_kwargs={'compress_level': compress_level})
+    return buffer.getvalue()
+
+
+class FigureTemplate:
+    # Base dos templates de cada gráfico
+    # As subclasses definem:
+    # - figsize
+    # - build(data): desenha a figura completa (a primeira vez)
+    # - matches(data): se a estrutura da figura serve para os novos dados
+    #   (mesmas categorias, mesmas colunas...); se não servir, o template é refeito
+    # - update(data): troca só os dados dos artistas já existentes
+    # Em build e update, self.dpi é a resolução com que a figura vai ser salva
+    # (None = a da própria figura), para quem ajusta o nível de detalhe a ela
+    figsize = None
+
+    def __init__(self, data, dpi=None):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=self.figsize)
+        FigureCanvasAgg(self.figure)
+        self.dpi = dpi
+        self.build(data)
+
+    def build(self, data):
+        raise NotImplementedError
+
+    def matches(self, data):
+        return False
+
+    def update(self, data):
+        raise NotImplementedError
+
+    def close(self):
+        # Solta todos os artistas da figura para que a memória seja liberada
+        self.figure.clear()
+
+
+class FigurePool:
+
+    def __init__(self, max_figures=16):
+        self.max_figures = max_figures
+        self.templates = collections.OrderedDict()  # Chave → template (do menos ao mais recente)
+        self.built = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def figure(self, key, template_class, data, dpi=None):
+        # Figura pronta com "data": reaproveita o template da chave se ele servir, senão monta outro
+        # - dpi: resolução com que a figura vai ser salva
+        template = self.templates.pop(key, None)
+        if template is not None and template.matches(data):
+            template.dpi = dpi
+            template.update(data)
+            self.reused += 1
+        else:
+            if template is not None:
+                template.close()
+            template = template_class(data, dpi)
+            self.built += 1
+        self.templates[key] = template
+
+        # O template recém-usado (o último) nunca sai, pois a figura ainda vai ser salva
+        while len(self.templates) > max(self.max_figures, 1):
+            _, oldest = self.templates.popitem(last=False)
+            oldest.close()
+            self.evicted += 1
+        return template.figure
+
+    def render(self, key, template_class, data, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+        return png_bytes(self.figure(key, template_class, data, dpi), dpi, compress_level)
+
+    def clear(self):
+        for template in self.templates.values():
+            template.close()
+        self.templates.clear()
+
+    def stats(self):
+        return {'built': self.built, 'reused': self.reused, 'evicted': self.evicted, 'templates': len(self.templates)}
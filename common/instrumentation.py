@@ -0,0 +1,186 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+# Instrumentação opcional das etapas de cada projeto
+#
+# Cada etapa com nome (leitura do CSV, limpeza, agregação, desenho, savefig...)
+# é marcada com:
+#     with stage('page_views.clean'):
+#         ...
+# (ou com o decorador @traced('medical.preprocess') em uma função inteira)
+# e, se a instrumentação estiver ligada, registra tempo de relógio, tempo de CPU
+# e o pico de memória alocada durante a etapa (via tracemalloc)
+#
+# Desligada (o padrão), stage() devolve sempre o mesmo contexto vazio: o custo
+# é uma checagem de variável global por etapa, sem medições nem alocações
+#
+# Como ligar:
+# - variável de ambiente PROJETOS_PYTHON_TRACE=arquivo.json → trace no formato do
+#   Chrome (abra em chrome://tracing ou https://ui.perfetto.dev); "log" → logs
+#   estruturados (uma linha JSON por etapa, nível INFO) no logger "projetos_python"
+# - ou no código: enable(trace_file='trace.json', log=True)
+# A configuração do logging (handlers, nível, formato) fica a cargo do programa
+# que usa os módulos, ex.: logging.basicConfig(level=logging.INFO, format='%(message)s')
+#
+# Só usa a biblioteca padrão (e importa o logging apenas se os logs forem ligados),
+# para não pesar na importação de módulos leves como sea_level_predictor/prediction.py
+#
+# O trace é gravado evento a evento no formato "JSON Array" (sem o "]" final,
+# que o Chrome aceita), em modo append: vários processos (ex.: o pool do
+# report_renderer) podem escrever no mesmo arquivo. O "[" inicial é gravado uma
+# única vez, por enable() no processo que cria o arquivo (antes de existirem
+# processos filhos); os eventos só acrescentam linhas
+
+ENV_VAR = 'PROJETOS_PYTHON_TRACE'
+LOGGER = 'projetos_python'
+
+_NOOP = contextlib.nullcontext()
+_enabled = False
+_config = {'trace_file': None, 'log': False, 'memory': True}
+_records = collections.deque(maxlen=10_000)  # Últimas etapas registradas
+_local = threading.local()
+
+
+def enable(trace_file=None, log=False, memory=True):
+    # Liga a instrumentação neste processo
+    # - trace_file: caminho do arquivo de trace do Chrome (ou None)
+    # - log: emite cada etapa como log estruturado
+    # - memory: mede o pico de memória (tracemalloc deixa o código mais lento)
+    global _enabled
+    _config.update(trace_file=trace_file and os.path.abspath(trace_file), log=log, memory=memory)
+    if trace_file:
+        _start_trace(_config['trace_file'])
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def _start_trace(path):
+    # Cria o arquivo com o "[" inicial; o modo 'x' falha se ele já existe, então só
+    # um processo grava o cabeçalho (os filhos, que herdam a variável de ambiente,
+    # encontram o arquivo já criado). Um arquivo vazio já existente também o recebe
+    try:
+        with open(path, 'x') as f:
+            f.write('[\n')
+    except FileExistsError:
+        if os.path.getsize(path) == 0:
+            with open(path, 'a') as f:
+                f.write('[\n')
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def records():
+    # Etapas já registradas neste processo (dicionários com nome, tempos e memória)
+    return list(_records)
+
+
+def stage(name, **args):
+    # Contexto que mede uma etapa; argumentos extras (ex.: rows=70000) vão junto no registro
+    if not _enabled:
+        return _NOOP
+    return _Stage(name, args)
+
+
+def traced(name):
+    # Decorador: mede cada chamada da função como a etapa "name"
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _Stage:
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        # Pilha de etapas abertas nesta thread, para que a memória de etapas
+        # aninhadas também conte no pico da etapa de fora
+        stack = _local.__dict__.setdefault('stack', [])
+        if _config['memory'] and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_start = self.peak = current
+        else:
+            self.memory_start = None
+        stack.append(self)
+        self.cpu_start = time.process_time()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        cpu = time.process_time() - self.cpu_start
+        stack = _local.stack
+        stack.pop()
+
+        record = {
+            'stage': self.name,
+            'wall_ms': (end - self.start) / 1e6,
+            'cpu_ms': cpu * 1e3,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            **self.args
+        }
+        if self.memory_start is not None and tracemalloc.is_tracing():
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = self.peak - self.memory_start
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        _emit(record, self.start // 1000, (end - self.start) // 1000)
+        return False
+
+
+def _emit(record, start_us, duration_us):
+    _records.append(record)
+    if _config['log']:
+        import logging
+        logging.getLogger(LOGGER).info(json.dumps(record, default=str))
+    if _config['trace_file']:
+        # Evento "X" (completo) do formato de trace do Chrome
+        event = {
+            'name': record['stage'],
+            'cat': record['stage'].split('.')[0],
+            'ph': 'X',
+            'ts': start_us,
+            'dur': duration_us,
+            'pid': record['pid'],
+            'tid': record['tid'],
+            'args': {k: v for k, v in record.items() if k not in ('stage', 'pid', 'tid')}
+        }
+        with open(_config['trace_file'], 'a') as f:
+            f.write(json.dumps(event, default=str) + ',\n')
+
+
+# Liga automaticamente pela variável de ambiente (herdada pelos processos filhos)
+if os.environ.get(ENV_VAR):
+    if os.environ[ENV_VAR] == 'log':
+        enable(log=True)
+    else:
+        enable(trace_file=os.environ[ENV_VAR])
@@ -0,0 +1,177 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+
+# Cache persistente (em disco) de resultados das análises e dos gráficos
+#
+# A chave de cada resultado combina:
+# - o nome da função que o calculou
+# - a "impressão digital" de cada arquivo de entrada: caminho, tamanho,
+#   data de modificação e um hash do conteúdo
+# - os parâmetros da chamada
+# - a versão do código: um hash dos .py da pasta do módulo da função e de common/
+# Se o arquivo de entrada ou o código mudarem, a chave muda e o resultado antigo
+# deixa de ser usado (e acaba sendo removido pela política LRU)
+#
+# O hash do conteúdo só é recalculado quando o tamanho ou a data de modificação
+# mudam; caso contrário vem de um pequeno índice salvo junto com o cache, de modo
+# que um acerto (hit) não lê nem interpreta o CSV
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'projetos-python')
+
+COMMON = os.path.dirname(os.path.abspath(__file__))
+
+
+class ResultCache:
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 ** 2, max_entries=10_000):
+        self.directory = directory or os.environ.get('PROJETOS_PYTHON_CACHE', DEFAULT_DIR)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hashes = None
+        self._code_versions = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    # 1. Impressão digital dos arquivos de entrada
+
+    def _hash_index_path(self):
+        return os.path.join(self.directory, 'fingerprints.json')
+
+    def fingerprint(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if self._hashes is None:
+            try:
+                with open(self._hash_index_path()) as f:
+                    self._hashes = json.load(f)
+            except (OSError, ValueError):
+                self._hashes = {}
+
+        # O hash do conteúdo é reaproveitado enquanto tamanho e data não mudarem
+        memo = f'{path}|{stat.st_size}|{stat.st_mtime_ns}'
+        digest = self._hashes.get(memo)
+        if digest is None:
+            content = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 ** 2), b''):
+                    content.update(block)
+            digest = content.hexdigest()
+            # Mantém só a versão mais recente de cada arquivo no índice
+            for old in [k for k in self._hashes if k.startswith(path + '|')]:
+                del self._hashes[old]
+            self._hashes[memo] = digest
+            self._write_atomic(self._hash_index_path(), json.dumps(self._hashes).encode())
+
+        return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+
+    def code_version(self, func):
+        # Hash do código que produz o resultado: os .py da pasta do módulo de func
+        # (o projeto) e os de common/, calculado uma vez por pasta
+        module = sys.modules.get(func.__module__)
+        path = getattr(module, '__file__', None)
+        if path is None:
+            return None
+        folder = os.path.dirname(os.path.abspath(path))
+        if folder not in self._code_versions:
+            digest = hashlib.blake2b(digest_size=16)
+            sources = set(glob.glob(os.path.join(folder, '*.py')) + glob.glob(os.path.join(COMMON, '*.py')))
+            for source in sorted(sources):
+                with open(source, 'rb') as f:
+                    digest.update(os.path.basename(source).encode() + b'\0' + f.read())
+            self._code_versions[folder] = digest.hexdigest()
+        return self._code_versions[folder]
+
+    def key(self, name, files=(), params=None, code=None):
+        description = json.dumps({
+            'name': name,
+            'code': code,
+            'files': [self.fingerprint(path) for path in files],
+            'params': params
+        }, sort_keys=True, default=repr)
+        return hashlib.blake2b(description.encode(), digest_size=20).hexdigest()
+
+    # 2. Leitura e gravação dos resultados
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key):
+        # Retorna (True, valor) em um acerto e (False, None) em uma falha
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return False, None
+        # Atualiza a data de acesso, usada pela política LRU
+        os.utime(path)
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        self._write_atomic(self._entry_path(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self._evict()
+
+    def memoize(self, func, files, *args, **kwargs):
+        # Chama func(*args, **kwargs) só se o resultado ainda não estiver no cache
+        name = f'{func.__module__}.{func.__qualname__}'
+        key = self.key(name, files, {'args': args, 'kwargs': kwargs}, self.code_version(func))
+        hit, value = self.get(key)
+        if not hit:
+            value = func(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    # 3. Remoção (LRU por data de acesso, limitada por tamanho total e número de entradas)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        return sorted(entries)
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, size, name = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, name in self._entries():
+            os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries)
+        }
+
+    def _write_atomic(self, path, data):
+        # Grava em um arquivo temporário e renomeia, para nunca deixar uma entrada pela metade
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+# Verifica que nenhum resultado antigo sobrevive a uma alteração do CSV: nem no
+# cache persistente (result_cache.py), nem nas memorizações em memória (lru_cache)
+# dos módulos, que o cache usa ao recalcular. Para cada figura (e para a previsão
+# do nível do mar), o CSV é reescrito com outros valores e o resultado precisa
+# mudar e ser igual ao de um cálculo sem cache sobre os dados novos
+# Uso: python test.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('common', 'medical_data_visualizer', 'page_view_time_series_visualizer', 'sea_level_predictor'):
+    sys.path.append(os.path.join(ROOT, folder))
+
+import medical_data_visualizer as medical
+import prediction
+import sea_level_predictor as sea_level
+import time_series_visualizer as page_views
+from result_cache import ResultCache
+
+
+def rewrite(path, column, change):
+    # Altera uma coluna do CSV e adianta a data de modificação em 1 s, para que a
+    # nova versão seja reconhecida mesmo em sistemas de arquivos com datas grossas
+    df = pd.read_csv(path)
+    df[column] = change(df[column])
+    stat = os.stat(path)
+    df.to_csv(path, index=False)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+if __name__ == '__main__':
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ResultCache(os.path.join(folder, 'cache'))
+        paths = {}
+        for name in ('medical_examination.csv', 'fcc-forum-pageviews.csv', 'epa-sea-level.csv'):
+            paths[name] = os.path.join(folder, name)
+            shutil.copy(os.path.join(ROOT, name), paths[name])
+
+        # (descrição, cálculo (com o cache indicado, ou None), CSV, coluna, alteração)
+        checks = [
+            ('medical cat', lambda c: medical.figure_png('cat', paths['medical_examination.csv'], cache=c),
+             'medical_examination.csv', 'weight', lambda v: v * 1.5),
+            ('medical heat', lambda c: medical.figure_png('heat', paths['medical_examination.csv'], cache=c),
+             'medical_examination.csv', 'ap_hi', lambda v: v + 10),
+            ('page_views line', lambda c: page_views.figure_png('line', paths['fcc-forum-pageviews.csv'], cache=c),
+             'fcc-forum-pageviews.csv', 'value', lambda v: v * 2),
+            ('page_views bar', lambda c: page_views.figure_png('bar', paths['fcc-forum-pageviews.csv'], cache=c),
+             'fcc-forum-pageviews.csv', 'value', lambda v: v * 2),
+            ('page_views box', lambda c: page_views.figure_png('box', paths['fcc-forum-pageviews.csv'], cache=c),
+             'fcc-forum-pageviews.csv', 'value', lambda v: v * 2),
+            ('sea_level plot', lambda c: sea_level.figure_png(paths['epa-sea-level.csv'], cache=c),
+             'epa-sea-level.csv', 'CSIRO Adjusted Sea Level', lambda v: v + 1),
+            ('sea_level prediction', lambda c: prediction.predict_sea_level(path=paths['epa-sea-level.csv']),
+             'epa-sea-level.csv', 'CSIRO Adjusted Sea Level', lambda v: v + 1)
+        ]
+        for label, compute, csv_name, column, change in checks:
+            before = compute(cache)
+            rewrite(paths[csv_name], column, change)
+            after = compute(cache)
+            fresh = compute(None)
+            if after == before or after != fresh:
+                failures += 1
+                print(f"{label}: o resultado {'não mudou' if after == before else 'difere do cálculo sem cache'}"
+                      " depois da alteração do CSV")
+
+    print(f"{len(checks)} verificações, {failures} falha(s)")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from sharded import calculate_sharded
+
+
+# Gera um fragmento sintético com as colunas do adult.csv usadas pelas métricas
+def synthetic_shard(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def pick(options, p=None):
+        return rng.choice(options, n_rows, p=p)
+
+    return pd.DataFrame({
+        'age': rng.integers(17, 91, n_rows),
+        'education': pick(['Bachelors', 'Masters', 'Doctorate', 'HS-grad', 'Some-college', '11th']),
+        'occupation': pick(['Adm-clerical', 'Exec-managerial', 'Prof-specialty', 'Sales', 'Tech-support']),
+        'race': pick(['White', 'Black', 'Asian-Pac-Islander', 'Amer-Indian-Eskimo', 'Other'],
+                     [0.85, 0.09, 0.03, 0.02, 0.01]),
+        'sex': pick(['Male', 'Female']),
+        'hours-per-week': rng.integers(1, 100, n_rows),
+        'native-country': pick(['United-States', 'Mexico', 'India', 'Cuba', 'Iran'],
+                               [0.9, 0.04, 0.03, 0.02, 0.01]),
+        'salary': pick(['<=50K', '>50K'], [0.76, 0.24])
+    })
+
+
+if __name__ == '__main__':
+    # Uso: python benchmark.py [n_fragmentos] [linhas_por_fragmento]
+    n_shards = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(n_shards):
+            synthetic_shard(n_rows, seed=i).to_csv(os.path.join(folder, f'shard_{i:03d}.csv'), index=False)
+
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            calculate_sharded(folder, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers} processo(s): {elapsed:6.2f}s | speedup {baseline / elapsed:4.2f}x "
+                  f"(núcleos disponíveis: {os.cpu_count()})")
@@ -1,84 +1,199 @@
+import os
+import sys
+
+import numpy as np
 import pandas as pd
 
-def calculate_demographic_data(filepath):
+# Registro dos conjuntos de dados e instrumentação opcional das etapas (common/)
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+import dataset_registry
+from instrumentation import traced
 
+# Colunas categóricas usadas pelas métricas (codificadas em inteiros uma única vez)
+CATEGORICAL = ['race', 'sex', 'education', 'occupation', 'native-country', 'salary']
 
-    # Lê o dataset a partir do arquivo CSV indicado no caminho "filepath"
-    df = pd.read_csv(filepath)
+# Níveis de educação considerados "avançados"
+ADVANCED_EDUCATION = ['Bachelors', 'Masters', 'Doctorate']
 
+# Colunas lidas no modo em blocos (as demais não são usadas por nenhuma métrica)
+USECOLS = CATEGORICAL + ['age', 'hours-per-week']
 
-    # 1. Conta quantas pessoas há de cada raça no conjunto de dados
-    # A função value_counts() conta quantas vezes cada valor aparece na coluna "race"
-    race_count = df['race'].value_counts()
 
+# 1. Codificação por dicionário
+# Cada coluna categórica vira um array de códigos inteiros (0, 1, 2, ...)
+# e uma lista com o valor correspondente a cada código (na ordem de aparição)
 
-    # 2. Calcula a média de idade dos homens
-    # Filtra apenas as linhas em que o sexo é "Male" e calcula a média da coluna "age"
-    # A função round(..., 1) arredonda o resultado para uma casa decimal
-    average_age_men = round(df.loc[df['sex'] == 'Male', 'age'].mean(), 1)
+def _encode(column):
+    codes, uniques = pd.factorize(column)
+    # Rótulos como Index comum (e não CategoricalIndex), para que tabelas de
+    # blocos diferentes possam ser somadas
+    return codes, pd.Index(np.asarray(uniques), name=column.name)
 
 
-    # 3. Calcula a porcentagem de pessoas com ensino superior (Bacharelado)
-    # Conta quantas linhas têm "Bachelors" na coluna "education"
-    # Divide pelo total de registros e multiplica por 100 para obter a porcentagem
-    percentage_bachelors = round(df.loc[df['education'] == 'Bachelors'].shape[0] / df.shape[0] * 100, 1)
+def _crosstab(codes_a, labels_a, codes_b, labels_b, keep=None):
+    # Tabela de contingência (a × b) com um único np.bincount sobre códigos combinados
+    # Valores ausentes (código -1) são ignorados, como no value_counts
+    valid = (codes_a >= 0) & (codes_b >= 0)
+    if keep is not None:
+        valid &= keep
+    combined = codes_a[valid] * len(labels_b) + codes_b[valid]
+    counts = np.bincount(combined, minlength=len(labels_a) * len(labels_b))
+    return pd.DataFrame(counts.reshape(len(labels_a), len(labels_b)), index=labels_a, columns=labels_b)
+
+
+# 2. Tabelas de contingência
+# Todas as métricas saem deste pequeno conjunto de tabelas, calculado
+# com uma passada por coluna sobre os códigos inteiros
+
+@traced('demographic.tables')
+def demographic_tables(df):
+    codes, labels = {}, {}
+    for col in CATEGORICAL:
+        codes[col], labels[col] = _encode(df[col])
+
+    # Horas trabalhadas também viram códigos (os rótulos são as próprias horas)
+    hours_codes, hours_labels = _encode(df['hours-per-week'])
+
+    # Linhas de quem ganha >50K, comparando códigos em vez de textos
+    # (get_indexer devolve -1 se o valor não existe; o "& salary >= 0" descarta os ausentes)
+    salary, salary_labels = codes['salary'], labels['salary']
+    rich = (salary == salary_labels.get_indexer(['>50K'])[0]) & (salary >= 0)
+
+    # Contagem e soma das idades por sexo (para a média de idade)
+    sex = codes['sex']
+    valid_sex = sex >= 0
+    sex_age = pd.DataFrame({
+        'count': np.bincount(sex[valid_sex], minlength=len(labels['sex'])),
+        'age_sum': np.bincount(sex[valid_sex], weights=df['age'].to_numpy()[valid_sex], minlength=len(labels['sex']))
+    }, index=labels['sex'])
+
+    # Países de quem ganha >50K, com os rótulos na ordem de aparição entre essas
+    # linhas (a mesma ordem de partida do value_counts() sobre elas)
+    rich_country, rich_country_labels = _encode(df['native-country'][rich])
+
+    race = codes['race']
+    return {
+        'rows': len(df),
+        'race': pd.Series(np.bincount(race[race >= 0], minlength=len(labels['race'])), index=labels['race']),
+        'sex_age': sex_age,
+        'education_salary': _crosstab(codes['education'], labels['education'], salary, salary_labels),
+        'hours_salary': _crosstab(hours_codes, hours_labels, salary, salary_labels),
+        'country_salary': _crosstab(codes['native-country'], labels['native-country'], salary, salary_labels),
+        'country_rich': pd.Series(np.bincount(rich_country[rich_country >= 0], minlength=len(rich_country_labels)),
+                                  index=rich_country_labels),
+        # Ocupações por país, apenas entre quem ganha >50K
+        'country_occupation_rich': _crosstab(codes['native-country'], labels['native-country'],
+                                             codes['occupation'], labels['occupation'], keep=rich)
+    }
+
+
+def _rich(table):
+    # Coluna ">50K" de uma tabela (zeros se ninguém no conjunto ganha >50K)
+    return table['>50K'] if '>50K' in table.columns else pd.Series(0, index=table.index)
+
 
+def _union(a, b):
+    # Rótulos de a seguidos dos rótulos novos de b, preservando a ordem de aparição
+    return a.append(b.difference(a, sort=False))
 
-    # 4. Calcula a porcentagem de pessoas com ensino avançado (Bacharelado, Mestrado ou Doutorado) que ganham mais de 50K
-    # Usa isin() para filtrar apenas as pessoas com esses níveis de educação
-    advanced_education = df[df['education'].isin(['Bachelors', 'Masters', 'Doctorate'])]
-    higher_education_rich = round(
-        advanced_education.loc[advanced_education['salary'] == '>50K'].shape[0] / advanced_education.shape[0] * 100, 1
-    )
 
+def merge_tables(a, b):
+    # Soma as tabelas de dois conjuntos de linhas (por exemplo, dois blocos do CSV)
+    # O resultado é o mesmo que se as tabelas tivessem sido calculadas sobre as linhas juntas
+    merged = {'rows': a['rows'] + b['rows']}
+    for key, table in a.items():
+        if key == 'rows':
+            continue
+        other = b[key]
+        index = _union(table.index, other.index)
+        if isinstance(table, pd.Series):
+            merged[key] = table.reindex(index, fill_value=0) + other.reindex(index, fill_value=0)
+        else:
+            columns = _union(table.columns, other.columns)
+            merged[key] = (table.reindex(index=index, columns=columns, fill_value=0) +
+                           other.reindex(index=index, columns=columns, fill_value=0))
+    return merged
 
-    # 5. Calcula a porcentagem de pessoas sem ensino avançado que ganham mais de 50K
-    # O símbolo ~ inverte o filtro, pegando quem NÃO tem educação avançada
-    lower_education = df[~df['education'].isin(['Bachelors', 'Masters', 'Doctorate'])]
-    lower_education_rich = round(
-        lower_education.loc[lower_education['salary'] == '>50K'].shape[0] / lower_education.shape[0] * 100, 1
-    )
 
+@traced('demographic.read_tables')
+def read_tables(filepath, chunksize):
+    # Modo em blocos (out-of-core): lê o CSV em pedaços de "chunksize" linhas,
+    # apenas com as colunas necessárias e com as colunas de texto como categorias,
+    # e acumula só as tabelas de contingência (a memória não depende do tamanho do arquivo)
+    tables = None
+    chunks = pd.read_csv(filepath, usecols=USECOLS, chunksize=chunksize,
+                         dtype={col: 'category' for col in CATEGORICAL})
+    for chunk in chunks:
+        part = demographic_tables(chunk)
+        tables = part if tables is None else merge_tables(tables, part)
+    return tables
 
-    # 6. Encontra o número mínimo de horas trabalhadas por semana
-    # A função min() retorna o menor valor encontrado na coluna
-    min_work_hours = df['hours-per-week'].min()
 
+# 3. Métricas a partir das tabelas
 
-    # 7. Calcula a porcentagem de pessoas que trabalham o mínimo de horas e ainda assim ganham mais de 50K
-    # Filtra as pessoas que trabalham exatamente o mínimo e calcula a proporção das que ganham mais de 50K
-    num_min_workers = df[df['hours-per-week'] == min_work_hours]
-    rich_percentage = round(
-        num_min_workers.loc[num_min_workers['salary'] == '>50K'].shape[0] / num_min_workers.shape[0] * 100, 1
-    )
+@traced('demographic.metrics')
+def metrics_from_tables(tables, country='India'):
 
+    # 1. Conta quantas pessoas há de cada raça no conjunto de dados
+    # Mesma ordem do value_counts(): da maior para a menor contagem
+    race_count = tables['race'][tables['race'] > 0].sort_values(ascending=False, kind='stable')
+    race_count = race_count.rename('count').rename_axis('race')
+
+
+    # 2. Calcula a média de idade dos homens
+    sex_age = tables['sex_age']
+    average_age_men = round(sex_age.loc['Male', 'age_sum'] / sex_age.loc['Male', 'count'], 1)
+
+
+    # 3. Calcula a porcentagem de pessoas com ensino superior (Bacharelado)
+    education_salary = tables['education_salary']
+    education_total = education_salary.sum(axis=1)
+    percentage_bachelors = round(int(education_total.get('Bachelors', 0)) / tables['rows'] * 100, 1)
+
+
+    # 4-5. Porcentagem de quem ganha mais de 50K com e sem ensino avançado
+    advanced = education_salary.index.isin(ADVANCED_EDUCATION)
+    education_rich = _rich(education_salary)
+    higher_education_rich = round(int(education_rich[advanced].sum()) / int(education_total[advanced].sum()) * 100, 1)
+    lower_education_rich = round(int(education_rich[~advanced].sum()) / int(education_total[~advanced].sum()) * 100, 1)
 
-    # 8. Encontra o país com a maior porcentagem de pessoas que ganham mais de 50K
-    # Conta quantas pessoas em cada país ganham >50K
-    country_salary_counts = df.loc[df['salary'] == '>50K', 'native-country'].value_counts()
 
+    # 6-7. Número mínimo de horas trabalhadas por semana e a porcentagem
+    # de quem trabalha esse mínimo e ainda assim ganha mais de 50K
+    hours_salary = tables['hours_salary']
+    hours_total = hours_salary.sum(axis=1)
+    min_work_hours = hours_total[hours_total > 0].index.min()
+    rich_percentage = round(int(_rich(hours_salary)[min_work_hours]) / int(hours_total[min_work_hours]) * 100, 1)
 
-    # Conta o total de pessoas por país
-    country_total_counts = df['native-country'].value_counts()
 
+    # 8. País com a maior porcentagem de pessoas que ganham mais de 50K
+    # As duas contagens ficam na ordem do value_counts() (da maior para a menor,
+    # empates na ordem de aparição). Como no original, a divisão alinha as séries
+    # pela união ordenada dos países quando a ordem delas difere, e os empates
+    # de porcentagem são desfeitos nessa ordem (ex.: Cuba antes de India)
+    country_total_counts = tables['country_salary'].sum(axis=1)
+    country_total_counts = country_total_counts[country_total_counts > 0].sort_values(ascending=False, kind='stable')
+    country_salary_counts = tables['country_rich']
+    country_salary_counts = country_salary_counts[country_salary_counts > 0].sort_values(ascending=False, kind='stable')
 
     # Calcula a porcentagem de ricos por país e ordena em ordem decrescente
     # fillna(0) substitui valores ausentes por 0 para evitar erros de divisão
     country_percentages = (country_salary_counts / country_total_counts * 100).fillna(0).sort_values(ascending=False)
-
-
-    # Identifica o país e o valor percentual mais alto
     highest_earning_country = country_percentages.index[0]
     highest_earning_country_percentage = round(country_percentages.iloc[0], 1)
 
 
-    # 9. Encontra a ocupação mais comum entre pessoas que ganham >50K na Índia
-    # Filtra registros onde o país é "India" e o salário é ">50K"
-    # Usa mode() para obter a ocupação mais frequente (moda)
-    top_occ_india = df.loc[
-        (df['native-country'] == 'India') & (df['salary'] == '>50K'),
-        'occupation'
-    ].mode()[0]
+    # 9. Ocupação mais comum entre pessoas que ganham >50K no país indicado (moda)
+    # Em caso de empate, a moda do pandas devolve o primeiro valor em ordem alfabética
+    country_occupation = tables['country_occupation_rich']
+    if country in country_occupation.index:
+        occupations = country_occupation.loc[country]
+    else:
+        occupations = pd.Series(dtype=np.int64)
+    occupations = occupations[occupations > 0]
+    top_occ_india = pd.Series(sorted(occupations.index[occupations == occupations.max()]))[0]
 
 
     # Retorna todos os resultados em um dicionário para facilitar o acesso posterior
@@ -96,6 +211,27 @@ def calculate_demographic_data(filepath):
     }
 
 
+def calculate_demographic_data(filepath, chunksize=None, cache=None):
+
+    # Com um cache (common/result_cache.py), o resultado é reaproveitado enquanto
+    # o arquivo e o código não mudarem, sem ler o CSV novamente
+    filepath = dataset_registry.locate(filepath)
+    if cache is not None:
+        return cache.memoize(calculate_demographic_data, [filepath], filepath, chunksize=chunksize)
+
+    # Com "chunksize", o arquivo é lido em blocos e só as tabelas ficam na memória
+    if chunksize is not None:
+        return metrics_from_tables(read_tables(filepath, chunksize))
+
+    # Lê o dataset a partir do arquivo CSV indicado no caminho "filepath", pelo registro
+    # de conjuntos de dados: as colunas são mapeadas do cache em disco e as colunas de
+    # texto chegam como categorias
+    df = dataset_registry.frame('adult', filepath)
+
+    # Monta as tabelas de contingência uma única vez e deriva todas as métricas delas
+    return metrics_from_tables(demographic_tables(df))
+
+
 # Bloco principal — executa apenas se o arquivo for rodado diretamente
 if __name__ == '__main__':
     # Cria um conjunto de dados fictício para teste local
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from main import CATEGORICAL, demographic_tables, metrics_from_tables
+import dataset_registry  # common/ já foi adicionado ao caminho por main.py
+
+
+# Índice em memória para consultas demográficas repetidas
+#
+# O CSV é lido uma única vez; para cada valor de cada coluna categórica é
+# guardado um bitmap (1 bit por pessoa, agrupado em palavras de 64 bits).
+# Uma consulta como "% >50K entre Masters na Índia" vira um AND entre bitmaps
+# e uma contagem de bits, sem percorrer o DataFrame
+
+def _bitmap(mask):
+    # Array booleano → palavras uint64 (bits que sobram no fim ficam zerados)
+    packed = np.packbits(mask, bitorder='little')
+    packed = np.pad(packed, (0, -len(packed) % 8))
+    return packed.view(np.uint64)
+
+
+def _count(bitmap):
+    return int(np.bitwise_count(bitmap).sum())
+
+
+class DemographicIndex:
+
+    def __init__(self, filepath):
+        df = dataset_registry.frame('adult', filepath)
+        self.rows = len(df)
+        self.all = _bitmap(np.ones(self.rows, dtype=bool))
+
+        # Idades em fatias de bits: um bitmap por bit de (idade - menor idade),
+        # para que a soma das idades selecionadas também seja só AND e contagem de bits
+        age = df['age'].to_numpy(dtype=np.int64)
+        self.age_base = int(age.min()) if self.rows else 0
+        offsets = age - self.age_base
+        self.age_planes = [_bitmap((offsets >> k) & 1 == 1) for k in range(int(offsets.max(initial=0)).bit_length())]
+
+        # Um bitmap por valor de cada coluna categórica
+        self.bitmaps = {}
+        for col in CATEGORICAL:
+            codes, uniques = pd.factorize(df[col])
+            self.bitmaps[col] = {value: _bitmap(codes == code) for code, value in enumerate(uniques)}
+
+        # Tabelas de contingência para as métricas originais (por país)
+        self.tables = demographic_tables(df)
+        self._metrics = {}
+
+    # 1. Filtros
+
+    def select(self, filters=None):
+        # Bitmap das pessoas que atendem a todos os filtros
+        # - filters: {coluna: valor} ou {coluna: [valores]} (qualquer um dos valores)
+        #   ex.: {'education': ['Bachelors', 'Masters'], 'native-country': 'India'}
+        if filters is not None and not isinstance(filters, dict):
+            raise ValueError("Os filtros devem ser um objeto JSON {coluna: valor}.")
+        selected = self.all
+        for col, values in (filters or {}).items():
+            if col not in self.bitmaps:
+                raise ValueError(f"Coluna não indexada: {col}")
+            if isinstance(values, str):
+                values = [values]
+            empty = np.zeros_like(self.all)
+            union = empty
+            for value in values:
+                union = union | self.bitmaps[col].get(value, empty)
+            selected = selected & union
+        return selected
+
+    # 2. Consultas
+
+    def count(self, filters=None):
+        return _count(self.select(filters))
+
+    def percentage(self, filters=None, condition=None):
+        # Porcentagem das pessoas que atendem a "filters" e também a "condition"
+        # (por padrão, quem ganha >50K)
+        selected = self.select(filters)
+        total = _count(selected)
+        if total == 0:
+            return None
+        matching = _count(selected & self.select(condition or {'salary': '>50K'}))
+        return round(matching / total * 100, 1)
+
+    def average_age(self, filters=None):
+        # Soma das idades = soma de 2**k × (pessoas selecionadas com o bit k ligado),
+        # mais a menor idade para cada pessoa selecionada; tudo em inteiros exatos
+        selected = self.select(filters)
+        total = _count(selected)
+        if total == 0:
+            return None
+        age_sum = self.age_base * total + sum(_count(selected & plane) << k for k, plane in enumerate(self.age_planes))
+        return round(age_sum / total, 1)
+
+    def top_value(self, col, filters=None):
+        # Valor mais comum de "col" entre as pessoas filtradas (empate: ordem alfabética, como mode())
+        selected = self.select(filters)
+        counts = {value: _count(selected & bitmap) for value, bitmap in self.bitmaps[col].items()}
+        best = max(counts.values(), default=0)
+        if best == 0:
+            return None
+        return min(value for value, count in counts.items() if count == best)
+
+    def metrics(self, country='India'):
+        # As mesmas métricas de calculate_demographic_data, com qualquer país no lugar da Índia
+        if country not in self._metrics:
+            self._metrics[country] = metrics_from_tables(self.tables, country=country)
+        return self._metrics[country]
+
+    def query(self, request):
+        # Ponto único de entrada usado pelo servidor: {'op': ..., parâmetros}
+        if not isinstance(request, dict):
+            raise ValueError("A requisição deve ser um objeto JSON {'op': ..., parâmetros}.")
+        op = request.get('op')
+        filters = request.get('filters')
+        if op == 'count':
+            return self.count(filters)
+        if op == 'percentage':
+            return self.percentage(filters, request.get('condition'))
+        if op == 'average_age':
+            return self.average_age(filters)
+        if op == 'top_value':
+            return self.top_value(request['column'], filters)
+        if op == 'metrics':
+            result = dict(self.metrics(request.get('country', 'India')))
+            result['race_count'] = result['race_count'].to_dict()
+            return result
+        raise ValueError(f"Operação desconhecida: {op}")
+
+
+# 3. Servidor asyncio
+# Protocolo: uma requisição JSON por linha, uma resposta JSON por linha
+# ex.: {"op": "percentage", "filters": {"education": "Masters", "native-country": "India"}}
+# Cada consulta leva microssegundos, então é respondida direto no laço de eventos
+
+async def _handle(index, reader, writer):
+    # A conexão é sempre fechada, mesmo se o cliente desconectar no meio de uma resposta
+    try:
+        while line := await reader.readline():
+            try:
+                response = {'result': index.query(json.loads(line))}
+            except (ValueError, KeyError, TypeError) as error:
+                response = {'error': str(error)}
+            writer.write(json.dumps(response, default=lambda value: value.item()).encode() + b'\n')
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(index, host='127.0.0.1', port=8765):
+    server = await asyncio.start_server(lambda r, w: _handle(index, r, w), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    # Uso: python query_server.py [arquivo.csv] [porta]
+    filepath = sys.argv[1] if len(sys.argv) > 1 else 'adult.csv'
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    asyncio.run(serve(DemographicIndex(filepath), port=port))
@@ -0,0 +1,55 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from main import demographic_tables, merge_tables, metrics_from_tables, read_tables
+import dataset_registry  # common/ já foi adicionado ao caminho por main.py
+
+
+# Processamento paralelo de um diretório de CSVs fragmentados (um por estado, ano, ...)
+# Cada processo lê um fragmento e devolve apenas as tabelas de contingência
+# (poucos KB), nunca o DataFrame; o processo principal só soma tabelas pequenas
+
+def _shard_tables(job):
+    path, chunksize = job
+    if chunksize is not None:
+        return read_tables(path, chunksize)
+    return demographic_tables(dataset_registry.frame('adult', path))
+
+
+def _shard_metrics(tables):
+    # Um fragmento pequeno pode não ter dados para alguma métrica
+    # (por exemplo, ninguém da Índia ganhando >50K); nesse caso devolve None
+    try:
+        return metrics_from_tables(tables)
+    except (KeyError, IndexError, ZeroDivisionError):
+        return None
+
+
+def calculate_sharded(shards, max_workers=None, chunksize=None):
+    # - shards: diretório com os arquivos .csv ou lista de caminhos
+    # - max_workers: número de processos (padrão: um por núcleo)
+    # - chunksize: se informado, cada fragmento também é lido em blocos
+    # Retorna as métricas combinadas (iguais às de um único CSV com todos os
+    # fragmentos concatenados, na ordem dos nomes) e as métricas de cada fragmento
+    if isinstance(shards, str):
+        shards = sorted(glob.glob(os.path.join(shards, '*.csv')))
+    if not shards:
+        raise ValueError("Nenhum arquivo CSV encontrado.")
+
+    jobs = [(path, chunksize) for path in shards]
+    if max_workers == 1:
+        parts = [_shard_tables(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(_shard_tables, jobs))
+
+    # Soma as tabelas na ordem dos fragmentos
+    combined = parts[0]
+    for part in parts[1:]:
+        combined = merge_tables(combined, part)
+
+    return {
+        'combined': metrics_from_tables(combined),
+        'shards': {os.path.basename(path): _shard_metrics(part) for path, part in zip(shards, parts)}
+    }
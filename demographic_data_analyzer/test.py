@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmark import synthetic_shard
+from main import calculate_demographic_data
+from sharded import calculate_sharded
+
+
+# Compara as métricas com a implementação original (pandas puro, direto sobre o
+# DataFrame) em conjuntos sintéticos pequenos, nos modos normal, em blocos e
+# fragmentado. Conjuntos pequenos têm muitos empates (países com a mesma porcentagem,
+# raças com a mesma contagem), que precisam ser desfeitos da mesma forma
+# Uso: python test.py [n_conjuntos]
+
+def reference_demographic_data(df):
+    race_count = df['race'].value_counts()
+    average_age_men = round(df.loc[df['sex'] == 'Male', 'age'].mean(), 1)
+    percentage_bachelors = round(df.loc[df['education'] == 'Bachelors'].shape[0] / df.shape[0] * 100, 1)
+    advanced_education = df[df['education'].isin(['Bachelors', 'Masters', 'Doctorate'])]
+    higher_education_rich = round(
+        advanced_education.loc[advanced_education['salary'] == '>50K'].shape[0] / advanced_education.shape[0] * 100, 1
+    )
+    lower_education = df[~df['education'].isin(['Bachelors', 'Masters', 'Doctorate'])]
+    lower_education_rich = round(
+        lower_education.loc[lower_education['salary'] == '>50K'].shape[0] / lower_education.shape[0] * 100, 1
+    )
+    min_work_hours = df['hours-per-week'].min()
+    num_min_workers = df[df['hours-per-week'] == min_work_hours]
+    rich_percentage = round(
+        num_min_workers.loc[num_min_workers['salary'] == '>50K'].shape[0] / num_min_workers.shape[0] * 100, 1
+    )
+    country_salary_counts = df.loc[df['salary'] == '>50K', 'native-country'].value_counts()
+    country_total_counts = df['native-country'].value_counts()
+    country_percentages = (country_salary_counts / country_total_counts * 100).fillna(0).sort_values(ascending=False)
+    top_occ_india = df.loc[(df['native-country'] == 'India') & (df['salary'] == '>50K'), 'occupation'].mode()[0]
+    return {
+        'race_count': race_count,
+        'average_age_men': average_age_men,
+        'percentage_bachelors': percentage_bachelors,
+        'higher_education_rich': higher_education_rich,
+        'lower_education_rich': lower_education_rich,
+        'min_work_hours': min_work_hours,
+        'rich_percentage': rich_percentage,
+        'highest_earning_country': country_percentages.index[0],
+        'highest_earning_country_percentage': round(country_percentages.iloc[0], 1),
+        'top_occ_india': top_occ_india
+    }
+
+
+def differences(expected, result):
+    diff = []
+    for key, value in expected.items():
+        if isinstance(value, pd.Series):
+            same = (list(value.index) == list(result[key].index) and
+                    list(value.to_numpy()) == list(result[key].to_numpy()))
+        else:
+            same = value == result[key]
+        if not same:
+            diff.append(f"{key}: esperado {value!r}, obtido {result[key]!r}")
+    return diff
+
+
+if __name__ == '__main__':
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    rng = np.random.default_rng(0)
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(n_samples):
+            n_rows = int(rng.integers(20, 400))
+            sample = synthetic_shard(n_rows, seed=i)
+            # Uma pessoa da Índia com >50K, para que a moda do item 9 exista
+            sample.loc[int(rng.integers(n_rows)), ['native-country', 'salary']] = ['India', '>50K']
+
+            path = os.path.join(folder, f'sample_{i:03d}.csv')
+            sample.to_csv(path, index=False)
+            expected = reference_demographic_data(pd.read_csv(path))
+            half = os.path.join(folder, f'shards_{i:03d}')
+            os.mkdir(half)
+            sample.iloc[:n_rows // 2].to_csv(os.path.join(half, 'a.csv'), index=False)
+            sample.iloc[n_rows // 2:].to_csv(os.path.join(half, 'b.csv'), index=False)
+
+            results = {
+                'normal': calculate_demographic_data(path),
+                'em blocos': calculate_demographic_data(path, chunksize=max(n_rows // 3, 1)),
+                'fragmentado': calculate_sharded(half, max_workers=1)['combined']
+            }
+            for mode, result in results.items():
+                diff = differences(expected, result)
+                if diff:
+                    failures += 1
+                    print(f"conjunto {i} ({mode}):\n  " + "\n  ".join(diff))
+
+    print(f"{n_samples} conjuntos comparados, {failures} divergência(s)")
+    sys.exit(1 if failures else 0)
@@ -1,5 +1,223 @@
+import os
+import sys
+
 import numpy as np
 
+# Instrumentação opcional das etapas (common/instrumentation.py)
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+from instrumentation import traced
+
+# Ordem das estatísticas no dicionário de saída (mesma ordem do calculate original)
+STATS = ('mean', 'variance', 'standard deviation', 'max', 'min', 'sum')
+
+
+def _as_batch(matrices):
+    # Converte a entrada em um array (N, 3, 3)
+    # Aceita tanto (N, 9) quanto (N, 3, 3)
+    batch = np.asarray(matrices)
+    if batch.ndim == 2 and batch.shape[1] == 9:
+        batch = batch.reshape(-1, 3, 3)
+    if batch.ndim != 3 or batch.shape[1:] != (3, 3):
+        raise ValueError("Por Favor insira matrizes com 9 números cada.")
+    return batch
+
+
+def _calculate_chunk(batch):
+    # Todas as estatísticas de um bloco (N, 3, 3) de uma só vez
+    n = batch.shape[0]
+    flat = batch.reshape(n, 9)
+
+    # 1. Intermediários compartilhados
+    # A soma é calculada uma única vez por eixo e reaproveitada para a média;
+    # a soma dos quadrados dos desvios é reaproveitada para variância e desvio padrão
+    # (mesma sequência de operações do np.var, então os resultados são idênticos)
+    sums = [batch.sum(axis=1), batch.sum(axis=2), flat.sum(axis=1)]
+    means = [sums[0] / 3, sums[1] / 3, sums[2] / 9]
+
+    dev = [batch - means[0][:, None, :],
+           batch - means[1][:, :, None],
+           flat - means[2][:, None]]
+    variances = [(dev[0] * dev[0]).sum(axis=1) / 3,
+                 (dev[1] * dev[1]).sum(axis=2) / 3,
+                 (dev[2] * dev[2]).sum(axis=1) / 9]
+    stds = [np.sqrt(v) for v in variances]
+
+    # 2. Máximo e mínimo não dependem dos intermediários acima
+    maxs = [batch.max(axis=1), batch.max(axis=2), flat.max(axis=1)]
+    mins = [batch.min(axis=1), batch.min(axis=2), flat.min(axis=1)]
+
+    return {
+        'mean': means,
+        'variance': variances,
+        'standard deviation': stds,
+        'max': maxs,
+        'min': mins,
+        'sum': sums
+    }
+
+
+@traced('mean_variance_std.calculate_batch')
+def calculate_batch(matrices):
+    # Versão em lote do calculate
+    # - matrices: array (N, 9) ou (N, 3, 3), ou um iterável (stream) de blocos nesses formatos
+    # Retorna um dicionário com as mesmas chaves do calculate, onde cada métrica tem:
+    #   [0] → array (N, 3) por coluna
+    #   [1] → array (N, 3) por linha
+    #   [2] → array (N,) total
+    if isinstance(matrices, (np.ndarray, list, tuple)):
+        return _calculate_chunk(_as_batch(matrices))
+
+    # Stream: processa bloco a bloco e empilha os resultados no final
+    parts = [_calculate_chunk(_as_batch(chunk)) for chunk in matrices]
+    if not parts:
+        raise ValueError("Por Favor insira ao menos uma matriz.")
+    return {
+        stat: [np.concatenate([part[stat][i] for part in parts]) for i in range(3)]
+        for stat in STATS
+    }
+
+
+class StatsAccumulator:
+    # Acumulador incremental (streaming) das mesmas estatísticas do calculate,
+    # para matrizes N x M de qualquer tamanho, lidas em blocos de linhas
+    # - Colunas (axis=0) e total: média/variância pelo método de Welford/Chan
+    #   (contagem, média e M2 = soma dos quadrados dos desvios), memória constante
+    # - Linhas (axis=1): cada linha é independente; só com keep_rows=True as
+    #   6 estatísticas de cada linha (não a linha em si) são guardadas, e aí a
+    #   memória cresce com o número de linhas
+
+    def __init__(self, keep_rows=False):
+        self.keep_rows = keep_rows
+        self.count = 0          # Número de linhas já consumidas
+        self.mean = None        # Média por coluna
+        self.m2 = None          # Soma dos quadrados dos desvios por coluna
+        self.sum = None         # Soma por coluna (no dtype da entrada)
+        self.max = None
+        self.min = None
+        self.rows = []          # Estatísticas por linha de cada bloco
+
+    def update(self, chunk):
+        # Consome um bloco de linhas (array 2D com M colunas)
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape(1, -1)
+        if chunk.ndim != 2 or chunk.shape[0] == 0:
+            raise ValueError("Por Favor insira um bloco 2D com ao menos uma linha.")
+        if self.mean is not None and chunk.shape[1] != self.mean.shape[0]:
+            raise ValueError("Todos os blocos devem ter o mesmo número de colunas.")
+
+        # 1. Estatísticas do bloco por coluna
+        n = chunk.shape[0]
+        chunk_sum = chunk.sum(axis=0)
+        chunk_mean = chunk_sum / n
+        dev = chunk - chunk_mean
+        chunk_m2 = (dev * dev).sum(axis=0)
+
+        # 2. Combina com o estado atual
+        self._combine(n, chunk_mean, chunk_m2, chunk_sum, chunk.max(axis=0), chunk.min(axis=0))
+
+        # 3. Estatísticas por linha (independentes entre si)
+        if self.keep_rows:
+            row_sum = chunk.sum(axis=1)
+            row_mean = row_sum / chunk.shape[1]
+            row_dev = chunk - row_mean[:, None]
+            row_var = (row_dev * row_dev).sum(axis=1) / chunk.shape[1]
+            self.rows.append({
+                'mean': row_mean,
+                'variance': row_var,
+                'standard deviation': np.sqrt(row_var),
+                'max': chunk.max(axis=1),
+                'min': chunk.min(axis=1),
+                'sum': row_sum
+            })
+        return self
+
+    def merge(self, other):
+        # Junta outro acumulador (por exemplo, de outro worker) a este
+        # As linhas do outro acumulador são colocadas depois das deste
+        if other.keep_rows != self.keep_rows:
+            raise ValueError("Os acumuladores devem usar o mesmo keep_rows.")
+        if other.count == 0:
+            return self
+        if self.count > 0 and other.mean.shape[0] != self.mean.shape[0]:
+            raise ValueError("Todos os blocos devem ter o mesmo número de colunas.")
+        self._combine(other.count, other.mean, other.m2, other.sum, other.max, other.min)
+        if self.keep_rows:
+            self.rows.extend(other.rows)
+        return self
+
+    def _combine(self, n, mean, m2, total, maximum, minimum):
+        # Fórmula paralela de Chan et al. para juntar (count, mean, M2)
+        if self.count == 0:
+            self.count = n
+            self.mean = np.asarray(mean, dtype=float)
+            self.m2 = np.asarray(m2, dtype=float)
+            self.sum = total
+            self.max = maximum
+            self.min = minimum
+            return
+        count = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / count)
+        self.m2 = self.m2 + m2 + delta * delta * (self.count * n / count)
+        self.count = count
+        self.sum = self.sum + total
+        self.max = np.maximum(self.max, maximum)
+        self.min = np.minimum(self.min, minimum)
+
+    def finalize(self):
+        # Retorna o dicionário no mesmo formato do calculate:
+        #   [0] → por coluna, [1] → por linha (None se keep_rows=False), [2] → total
+        if self.count == 0:
+            raise ValueError("Nenhum dado foi acumulado.")
+
+        # Total a partir das colunas: todas têm o mesmo número de linhas,
+        # então a média total é a média das médias e o M2 total soma
+        # o M2 de cada coluna com a dispersão entre as médias das colunas
+        n_cols = self.mean.shape[0]
+        col_var = self.m2 / self.count
+        total_mean = self.mean.mean()
+        total_m2 = self.m2.sum() + self.count * ((self.mean - total_mean) ** 2).sum()
+        total_var = total_m2 / (self.count * n_cols)
+
+        rows = None
+        if self.keep_rows:
+            rows = {stat: np.concatenate([part[stat] for part in self.rows]) for stat in STATS}
+
+        columns = {
+            'mean': self.mean,
+            'variance': col_var,
+            'standard deviation': np.sqrt(col_var),
+            'max': self.max,
+            'min': self.min,
+            'sum': self.sum
+        }
+        totals = {
+            'mean': total_mean,
+            'variance': total_var,
+            'standard deviation': np.sqrt(total_var),
+            'max': self.max.max(),
+            'min': self.min.min(),
+            'sum': self.sum.sum()
+        }
+        return {
+            stat: [columns[stat], None if rows is None else rows[stat], totals[stat]]
+            for stat in STATS
+        }
+
+
+@traced('mean_variance_std.calculate_stream')
+def calculate_stream(chunks, keep_rows=False):
+    # Calcula as estatísticas de uma matriz N x M lida em blocos de linhas
+    # - keep_rows: também devolve as estatísticas de cada linha (memória proporcional a N)
+    acc = StatsAccumulator(keep_rows=keep_rows)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.finalize()
+
+
 def calculate(list):
 
 
@@ -11,17 +229,17 @@ def calculate(list):
         raise ValueError("Por Favor insira 9 números.")
 
 
-    # 2. Transformação em matriz 3x3
+    # 2. Cálculos estatísticos
 
-    # Converte a lista em um array NumPy e reorganiza em uma matriz 3x3
+    # Reaproveita o cálculo em lote com uma única matriz 3x3 (N = 1)
     # Exemplo: [1,2,3,4,5,6,7,8,9] vira
     # [[1,2,3],
     #  [4,5,6],
     #  [7,8,9]]
-    matrix = np.array(list).reshape(3, 3)
+    batch = calculate_batch(np.array(list).reshape(1, 3, 3))
 
 
-    # 3. Cálculos estatísticos
+    # 3. Conversão para o formato original
 
     # O dicionário 'calculations' guarda, para cada métrica (média, variância, etc.),
     # três valores:
@@ -29,36 +247,12 @@ def calculate(list):
     #   [1] → resultado por linha (axis=1)
     #   [2] → resultado total (toda a matriz)
     calculations = {
-        'mean': [
-            np.mean(matrix, axis=0).tolist(),  # Média por coluna
-            np.mean(matrix, axis=1).tolist(),  # Média por linha
-            matrix.mean().item()               # Média total
-        ],
-        'variance': [
-            np.var(matrix, axis=0).tolist(),   # Variância por coluna
-            np.var(matrix, axis=1).tolist(),   # Variância por linha
-            matrix.var().item()                # Variância total
-        ],
-        'standard deviation': [
-            np.std(matrix, axis=0).tolist(),   # Desvio padrão por coluna
-            np.std(matrix, axis=1).tolist(),   # Desvio padrão por linha
-            matrix.std().item()                # Desvio padrão total
-        ],
-        'max': [
-            np.max(matrix, axis=0).tolist(),   # Máximo por coluna
-            np.max(matrix, axis=1).tolist(),   # Máximo por linha
-            matrix.max().item()                # Máximo total
-        ],
-        'min': [
-            np.min(matrix, axis=0).tolist(),   # Mínimo por coluna
-            np.min(matrix, axis=1).tolist(),   # Mínimo por linha
-            matrix.min().item()                # Mínimo total
-        ],
-        'sum': [
-            np.sum(matrix, axis=0).tolist(),   # Soma por coluna
-            np.sum(matrix, axis=1).tolist(),   # Soma por linha
-            matrix.sum().item()                # Soma total
+        stat: [
+            batch[stat][0][0].tolist(),  # Por coluna
+            batch[stat][1][0].tolist(),  # Por linha
+            batch[stat][2][0].item()     # Total
         ]
+        for stat in STATS
     }
 
 
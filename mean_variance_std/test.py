@@ -1,6 +1,15 @@
-from main import calculate
+from main import calculate, calculate_batch, calculate_stream
 
 result = calculate([10, 20, 30, 40, 50, 60, 70, 80, 90])
 
 print(result)
 
+batch = calculate_batch([[10, 20, 30, 40, 50, 60, 70, 80, 90],
+                         [0, 1, 2, 3, 4, 5, 6, 7, 8]])
+
+print(batch)
+
+stream = calculate_stream([[[1, 2, 3, 4], [5, 6, 7, 8]],
+                           [[9, 10, 11, 12]]], keep_rows=True)
+
+print(stream)
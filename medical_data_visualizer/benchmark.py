@@ -0,0 +1,56 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from medical_data_visualizer import DTYPES, preprocess
+
+
+# Gera um conjunto de dados sintético com o mesmo formato de medical_examination.csv
+def synthetic_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(n_rows),
+        'age': rng.integers(10798, 23714, n_rows),
+        'sex': rng.integers(1, 3, n_rows),
+        'height': rng.integers(140, 200, n_rows),
+        'weight': rng.integers(400, 1200, n_rows) / 10,
+        'ap_hi': rng.integers(90, 180, n_rows),
+        'ap_lo': rng.integers(60, 120, n_rows),
+        'cholesterol': rng.integers(1, 4, n_rows),
+        'gluc': rng.integers(1, 4, n_rows),
+        'smoke': rng.integers(0, 2, n_rows),
+        'alco': rng.integers(0, 2, n_rows),
+        'active': rng.integers(0, 2, n_rows),
+        'cardio': rng.integers(0, 2, n_rows)
+    }).astype(DTYPES)
+
+
+# Pré-processamento antigo (colunas temporárias + apply linha a linha), só para comparação
+def preprocess_apply(df):
+    df['height_m'] = df['height'] / 100
+    df['bmi'] = df['weight'] / (df['height_m'] ** 2)
+    df['overweight'] = (df['bmi'] > 25).astype(int)
+    df['cholesterol'] = df['cholesterol'].apply(lambda x: 0 if x == 1 else 1)
+    df['gluc'] = df['gluc'].apply(lambda x: 0 if x == 1 else 1)
+    return df
+
+
+def rows_per_second(func, data):
+    df = data.copy()
+    start = time.perf_counter()
+    func(df)
+    return len(df) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    # Uso: python benchmark.py [n_linhas ...]  (padrão: 1M e 10M)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+
+    for n_rows in sizes:
+        data = synthetic_data(n_rows)
+        before = rows_per_second(preprocess_apply, data)
+        after = rows_per_second(preprocess, data)
+        print(f"{n_rows:>12,} linhas | antes: {before:>14,.0f} linhas/s | "
+              f"depois: {after:>14,.0f} linhas/s | {after / before:.1f}x")
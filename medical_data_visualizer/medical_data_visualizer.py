@@ -1,54 +1,131 @@
 # Importação das bibliotecas necessárias
+import functools
+import os
+import sys
+
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
+from seaborn.utils import relative_luminance
+
+# Módulos compartilhados (common/): registro dos conjuntos de dados, pool de figuras
+# e instrumentação opcional das etapas
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+import dataset_registry
+from figure_pool import DEFAULT_COMPRESS_LEVEL, FigurePool, FigureTemplate
+from instrumentation import stage, traced
+
+
+# Tipos compactos de cada coluna do CSV (esquema em common/dataset_registry.py)
+DTYPES = dataset_registry.DATASETS['medical'][1]
+
+DATA_FILE = 'medical_examination.csv'
+
+# Tamanho de cada figura (em polegadas)
+FIGSIZE = {
+    'cat': (12, 5),
+    'heat': (12, 12)
+}
+
+
+# 1. Leitura do CSV (pelo registro de conjuntos de dados)
+# Na primeira leitura o CSV é convertido em colunas .npy ao lado dele; nas seguintes
+# as colunas são mapeadas direto do disco, sem interpretar o texto novamente
 
+def read_data(path=DATA_FILE, cache=True):
+    # Lê o CSV com os tipos compactos, reaproveitando o cache colunar quando possível
+    return dataset_registry.frame('medical', path, cache)
 
-# Lê o arquivo CSV contendo dados médicos e armazena em um DataFrame chamado df
-df = pd.read_csv('medical_examination.csv')
 
+# 2. Pré-processamento vetorizado
+# Tudo é feito direto sobre os arrays NumPy, sem colunas temporárias
+# e sem funções Python aplicadas linha a linha
 
-# 2. Cálculo do IMC e criação da coluna 'overweight'
+@traced('medical.preprocess')
+def preprocess(df):
+    height = df['height'].to_numpy()
+    weight = df['weight'].to_numpy()
 
-# Converte altura de centímetros para metros
-df['height_m'] = df['height'] / 100
+    # Cria a coluna 'overweight':
+    # - 1 se o IMC (peso / altura² em metros) for maior que 25 (acima do peso)
+    # - 0 caso contrário (peso normal ou abaixo)
+    df['overweight'] = (weight / (height / 100) ** 2 > 25).astype('int8')
 
+    # Normalização dos dados: padroniza para que 0 = bom e 1 = ruim
+    # Para 'cholesterol' e 'gluc':
+    # - Se o valor for 1 (normal), vira 0
+    # - Se o valor for maior que 1 (acima do normal), vira 1
+    for col in ('cholesterol', 'gluc'):
+        df[col] = (df[col].to_numpy() != 1).astype('int8')
 
-# Calcula o IMC (Índice de Massa Corporal): peso / (altura²)
-df['bmi'] = df['weight'] / (df['height_m'] ** 2)
+    return df
 
 
-# Cria uma nova coluna 'overweight':
-# - 1 se o IMC for maior que 25 (acima do peso)
-# - 0 caso contrário (peso normal ou abaixo)
-df['overweight'] = (df['bmi'] > 25).astype(int)
+# 3. Carregamento preguiçoso (lazy) do DataFrame já pré-processado
+# O arquivo só é lido na primeira vez em que os dados são necessários,
+# e o resultado fica guardado em memória para as chamadas seguintes
+# (por versão do arquivo: se o CSV mudar, ele é lido de novo)
 
+def load_data(path=DATA_FILE, cache=True):
+    return _load_data(*dataset_registry.file_version(path), cache)
 
-# 3. Normalização dos dados
 
-# Objetivo: padronizar os dados para que 0 = bom e 1 = ruim
-# Para 'cholesterol' e 'gluc':
-# - Se o valor for 1 (normal), vira 0
-# - Se o valor for maior que 1 (acima do normal), vira 1
-df['cholesterol'] = df['cholesterol'].apply(lambda x: 0 if x == 1 else 1)
-df['gluc'] = df['gluc'].apply(lambda x: 0 if x == 1 else 1)
+@functools.lru_cache(maxsize=8)
+def _load_data(path, size, mtime_ns, cache):
+    return preprocess(read_data(path, cache))
+
+
+def __getattr__(name):
+    # Mantém o acesso a medical_data_visualizer.df, mas sem ler o arquivo na importação
+    if name == 'df':
+        return load_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # FUNÇÃO 1: Gráfico categórico (cat plot)
 
-def draw_cat_plot():
-    # 5. Reorganizar os dados em formato “longo” (long format)
-    # pd.melt transforma várias colunas em pares (variável, valor)
-    # Aqui analisamos 6 variáveis de estilo de vida/saúde por paciente
-    df_cat = pd.melt(df, 
-                     id_vars=['cardio'], 
-                     value_vars=['cholesterol', 'gluc', 'smoke', 'alco', 'active', 'overweight'])
+# As 6 variáveis de estilo de vida/saúde analisadas, em ordem alfabética
+# (a mesma ordem que o groupby produzia sobre o formato longo)
+CAT_VARIABLES = ['active', 'alco', 'cholesterol', 'gluc', 'overweight', 'smoke']
+
+
+@traced('medical.count_categories')
+def count_categories(data):
+    # Conta quantos casos existem para cada combinação (cardio, variável, valor)
+    # direto das colunas binárias, sem montar o formato "longo" com pd.melt
+    # - data: DataFrame já pré-processado ou um iterável de blocos (chunks) dele
+    if isinstance(data, pd.DataFrame):
+        data = [data]
 
+    # counts[i, 2 * cardio + valor] → total da variável CAT_VARIABLES[i]
+    counts = np.zeros((len(CAT_VARIABLES), 4), dtype=np.int64)
+    for chunk in data:
+        cardio = chunk['cardio'].to_numpy().astype(np.intp) * 2
+        for i, col in enumerate(CAT_VARIABLES):
+            counts[i] += np.bincount(cardio + chunk[col].to_numpy(), minlength=4)[:4]
 
-    # 6. Agrupar os dados e contar quantos casos existem para cada combinação
-    # (cardio, variável, valor)
-    df_cat = df_cat.groupby(['cardio', 'variable', 'value']).size().reset_index(name='total')
+    # Monta a tabela (cardio, variable, value, total) ordenada como no groupby,
+    # mantendo apenas as combinações que aparecem nos dados
+    cardio, variable, value = np.meshgrid([0, 1], np.arange(len(CAT_VARIABLES)), [0, 1], indexing='ij')
+    total = counts[variable, cardio * 2 + value].ravel()
+    df_cat = pd.DataFrame({
+        'cardio': cardio.ravel(),
+        'variable': np.array(CAT_VARIABLES)[variable.ravel()],
+        'value': value.ravel(),
+        'total': total
+    })
+    return df_cat[df_cat['total'] > 0].reset_index(drop=True)
+
+
+def draw_cat_plot(df_cat=None):
+    # 5-6. Tabela de contagens por (cardio, variável, valor)
+    # Pode ser passada já agregada (por exemplo, somando vários blocos com
+    # count_categories); caso contrário é calculada a partir dos dados carregados
+    if df_cat is None:
+        df_cat = count_categories(load_data())
 
 
     # 7. Criar gráfico de barras categórico
@@ -56,44 +133,161 @@ def draw_cat_plot():
     # - y: total (quantidade)
     # - hue: separação entre valor 0 e 1
     # - col: divide os gráficos entre pessoas com e sem problema cardíaco (cardio)
-    fig = sns.catplot(
-        x='variable',
-        y='total',
-        hue='value',
-        col='cardio',
-        data=df_cat,
-        kind='bar'
-    ).fig
+    with stage('medical.render', figure='catplot'):
+        fig = sns.catplot(
+            x='variable',
+            y='total',
+            hue='value',
+            col='cardio',
+            data=df_cat,
+            kind='bar'
+        ).fig
 
     # 8. Salva o gráfico gerado como imagem
-    fig.savefig('catplot.png')
+    with stage('medical.savefig', figure='catplot'):
+        fig.savefig('catplot.png')
+
+    # Fecha a figura no pyplot (ela continua utilizável por quem a recebe),
+    # para que chamadas repetidas não acumulem figuras na memória
+    plt.close(fig)
     return fig
 
 
+@traced('medical.plot_cat')
+def plot_cat(fig, df_cat):
+    # Mesmo gráfico do draw_cat_plot, mas desenhado em uma figura já criada
+    # (o sns.catplot sempre cria a própria figura pelo pyplot, então aqui
+    # cada painel de 'cardio' é um sns.barplot em um eixo da figura)
+    axes = fig.subplots(1, 2, sharey=True)
+    for ax, cardio in zip(axes, (0, 1)):
+        sns.barplot(
+            x='variable',
+            y='total',
+            hue='value',
+            data=df_cat[df_cat['cardio'] == cardio],
+            order=CAT_VARIABLES,
+            ax=ax
+        )
+        ax.set_title(f'cardio = {cardio}')
+        ax.get_legend().remove()
+    axes[1].set_ylabel('')
+
+    # Uma única legenda para os dois painéis, à direita
+    handles, labels = axes[0].get_legend_handles_labels()
+    fig.legend(handles, labels, title='value', loc='center right')
+    fig.subplots_adjust(right=0.9)
+
+
 # FUNÇÃO 2: Mapa de calor (heat map)
 
-def draw_heat_map():
-    # 11. Limpeza dos dados
-    # Remove dados incorretos ou extremos:
-    # - Pressão diastólica (ap_lo) não pode ser maior que a sistólica (ap_hi)
-    # - Altura e peso devem estar dentro do intervalo entre os percentis 2.5% e 97.5%
-    df_heat = df[
-        (df['ap_lo'] <= df['ap_hi']) &
-        (df['height'] >= df['height'].quantile(0.025)) &
-        (df['height'] <= df['height'].quantile(0.975)) &
-        (df['weight'] >= df['weight'].quantile(0.025)) &
-        (df['weight'] <= df['weight'].quantile(0.975))
-    ]
-
-    # 12. Calcula a matriz de correlação (mostra a relação entre as variáveis numéricas)
-    corr = df_heat.corr(numeric_only=True)
+# Tamanho dos blocos usados ao percorrer um DataFrame já carregado
+CHUNK_ROWS = 1_000_000
+
+
+def iter_chunks(path=DATA_FILE, chunksize=CHUNK_ROWS):
+    # Lê o CSV em blocos já pré-processados, para arquivos que não cabem na memória
+    for chunk in pd.read_csv(dataset_registry.locate(path), dtype=DTYPES, chunksize=chunksize):
+        yield preprocess(chunk)
+
+
+def _chunks(data):
+    # Normaliza a entrada: DataFrame (fatiado em blocos) ou função que devolve um iterável de blocos
+    # Uma função é necessária porque os blocos são percorridos duas vezes
+    if isinstance(data, pd.DataFrame):
+        return (data.iloc[i:i + CHUNK_ROWS] for i in range(0, len(data), CHUNK_ROWS))
+    return iter(data())
+
+
+@traced('medical.percentile_bounds')
+def percentile_bounds(data, columns=('height', 'weight'), q=(0.025, 0.975)):
+    # Percentis exatos (interpolação linear, como Series.quantile) em uma única passada
+    # Cada bloco contribui com a contagem de cada valor distinto; as contagens
+    # se juntam entre blocos, e o percentil é escolhido sobre os valores ordenados
+    counts = {col: None for col in columns}
+    for chunk in _chunks(data):
+        for col in columns:
+            part = chunk[col].value_counts(sort=False)
+            counts[col] = part if counts[col] is None else counts[col].add(part, fill_value=0)
+
+    q = np.asarray(q, dtype=float)
+    bounds = {}
+    for col in columns:
+        freq = counts[col].sort_index()
+        values = freq.index.to_numpy()
+        if values.dtype.kind != 'f':
+            values = values.astype(float)
+        cum = np.cumsum(freq.to_numpy(dtype=np.int64))
+
+        # Posição (base 0) de cada percentil na série ordenada completa
+        pos = (cum[-1] - 1) * q
+        lo = np.floor(pos)
+        a = values[np.searchsorted(cum, lo, side='right')]
+        b = values[np.searchsorted(cum, np.minimum(lo + 1, cum[-1] - 1), side='right')]
+
+        # Mesma interpolação usada pelo NumPy/pandas
+        # (a diferença b - a fica no dtype da coluna, como no np.quantile)
+        t = pos - lo
+        bounds[col] = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return bounds
+
+
+@traced('medical.heat_map_corr')
+def heat_map_corr(data):
+    # Matriz de correlação dos dados limpos, acumulada bloco a bloco
+    # - data: DataFrame pré-processado ou função sem argumentos que devolve
+    #   um iterável de blocos (por exemplo, lambda: iter_chunks(caminho))
+    # Nenhuma cópia filtrada completa é criada: cada bloco é filtrado e
+    # reduzido a (contagem, médias, co-momentos), que se juntam pela fórmula de Chan
+
+    # 11. Limites de altura e peso (percentis 2.5% e 97.5%)
+    bounds = percentile_bounds(data)
+
+    count, mean, comoment, columns = 0, None, None, None
+    for chunk in _chunks(data):
+        # Remove dados incorretos ou extremos:
+        # - Pressão diastólica (ap_lo) não pode ser maior que a sistólica (ap_hi)
+        # - Altura e peso devem estar dentro do intervalo entre os percentis
+        keep = chunk['ap_lo'].to_numpy() <= chunk['ap_hi'].to_numpy()
+        for col, (low, high) in bounds.items():
+            values = chunk[col].to_numpy()
+            keep &= (values >= low) & (values <= high)
+
+        if columns is None:
+            columns = chunk.select_dtypes('number').columns
+        x = chunk[columns].to_numpy(dtype=float)[keep]
+        n = x.shape[0]
+        if n == 0:
+            continue
+
+        # 12. Co-momentos do bloco (centrados na média do bloco) e junção com o acumulado
+        chunk_mean = x.mean(axis=0)
+        dev = x - chunk_mean
+        chunk_comoment = dev.T @ dev
+        if count == 0:
+            count, mean, comoment = n, chunk_mean, chunk_comoment
+            continue
+        total = count + n
+        delta = chunk_mean - mean
+        comoment = comoment + chunk_comoment + np.outer(delta, delta) * (count * n / total)
+        mean = mean + delta * (n / total)
+        count = total
+
+    # Correlação de Pearson a partir dos co-momentos
+    std = np.sqrt(np.diag(comoment))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = comoment / np.outer(std, std)
+    np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+@traced('medical.plot_heat_map')
+def plot_heat_map(fig, corr):
+    # Desenha o mapa de calor em uma figura já criada (pyplot ou Figure do matplotlib)
+    ax = fig.subplots()
 
     # 13. Cria uma máscara para esconder o triângulo superior da matriz (reduz redundância visual)
     mask = np.triu(corr)
 
-    # 14. Define o tamanho da figura
-    fig, ax = plt.subplots(figsize=(12, 12))
-
     # 15. Cria o mapa de calor com anotações dos valores de correlação
     sns.heatmap(
         corr,
@@ -104,9 +298,116 @@ def draw_heat_map():
         square=True,         # Mantém as células quadradas
         center=0,            # Centraliza o gradiente de cor no 0
         vmin=-0.5, vmax=0.5, # Define os limites do gradiente de cor
-        cbar_kws={'shrink': 0.44}  # Ajusta o tamanho da barra de cores
+        cbar_kws={'shrink': 0.44},  # Ajusta o tamanho da barra de cores
+        ax=ax
     )
 
+
+def draw_heat_map(corr=None):
+    # 11-12. Matriz de correlação dos dados limpos
+    # Pode ser passada já calculada (por exemplo, com heat_map_corr sobre um
+    # arquivo lido em blocos); caso contrário é calculada a partir dos dados carregados
+    if corr is None:
+        corr = heat_map_corr(load_data())
+
+    # 14. Define o tamanho da figura e desenha o mapa de calor
+    fig = plt.figure(figsize=FIGSIZE['heat'])
+    plot_heat_map(fig, corr)
+
     # 16. Salva o gráfico como imagem
-    fig.savefig('heatmap.png')
+    with stage('medical.savefig', figure='heatmap'):
+        fig.savefig('heatmap.png')
+    plt.close(fig)
     return fig
+
+
+# Renderização rápida para relatórios repetidos (common/figure_pool.py)
+# Cada gráfico vira um template: a figura é montada uma vez e, nas chamadas
+# seguintes, só as alturas das barras ou as cores e textos das células mudam
+
+class CatTemplate(FigureTemplate):
+    figsize = FIGSIZE['cat']
+
+    def build(self, df_cat):
+        plot_cat(self.figure, df_cat)
+        self.axes = self.figure.axes
+        # Só é reaproveitável se todas as 24 barras existirem (2 cardio x 6 variáveis x 2 valores)
+        self.reusable = len(df_cat) == 24 and all(
+            len(container) == len(CAT_VARIABLES) for ax in self.axes for container in ax.containers)
+
+    def matches(self, df_cat):
+        return self.reusable and len(df_cat) == 24
+
+    def update(self, df_cat):
+        totals = df_cat.set_index(['cardio', 'value', 'variable'])['total']
+        for cardio, ax in zip((0, 1), self.axes):
+            # Um grupo de barras (container) por valor do hue, na ordem de CAT_VARIABLES
+            for value, container in zip((0, 1), ax.containers):
+                for bar, variable in zip(container, CAT_VARIABLES):
+                    bar.set_height(totals[(cardio, value, variable)])
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+
+
+def _heat_mask(corr):
+    # Mesma máscara do plot_heat_map (np.triu) somada às células vazias (NaN),
+    # que o seaborn também esconde
+    values = corr.to_numpy()
+    return (np.triu(values) != 0) | np.isnan(values)
+
+
+class HeatMapTemplate(FigureTemplate):
+    figsize = FIGSIZE['heat']
+
+    def build(self, corr):
+        plot_heat_map(self.figure, corr)
+        ax = self.figure.axes[0]
+        self.columns = list(corr.columns)
+        self.mask = _heat_mask(corr)
+        self.mesh = ax.collections[0]
+        self.texts = list(ax.texts)  # Uma anotação por célula visível, na ordem das células
+
+    def matches(self, corr):
+        return (list(corr.columns) == self.columns and list(corr.index) == self.columns
+                and np.array_equal(_heat_mask(corr), self.mask))
+
+    def update(self, corr):
+        values = corr.to_numpy()
+        self.mesh.set_array(np.ma.masked_where(self.mask, values))
+        self.mesh.update_scalarmappable()
+
+        # Texto e cor de cada anotação, com a mesma regra de contraste do seaborn
+        visible = ~self.mask.ravel()
+        colors = self.mesh.get_facecolors()[visible]
+        for text, color, value in zip(self.texts, colors, values.ravel()[visible]):
+            text.set_text(f'{value:.1f}')
+            text.set_color('.15' if relative_luminance(color) > .408 else 'w')
+
+
+TEMPLATES = {'cat': CatTemplate, 'heat': HeatMapTemplate}
+POOL = FigurePool()
+
+
+def render_png(name, data, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL, pool=POOL):
+    # PNG em memória de uma figura a partir dos dados já agregados
+    # - name: 'cat' (tabela do count_categories) ou 'heat' (matriz do heat_map_corr)
+    if name not in TEMPLATES:
+        raise ValueError(f"Figura desconhecida: {name}")
+    return pool.render(name, TEMPLATES[name], data, dpi, compress_level)
+
+
+# PNG em memória (bytes) de uma figura, sem passar pelo pyplot nem gravar em disco
+# Com um cache (common/result_cache.py), os bytes são reaproveitados enquanto
+# o CSV e o código não mudarem, sem ler nem analisar os dados novamente
+
+def figure_png(name, path=DATA_FILE, cache=None, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    # - name: 'cat' (gráfico categórico) ou 'heat' (mapa de calor)
+    path = dataset_registry.locate(path)
+    if cache is not None:
+        return cache.memoize(figure_png, [path], name, path, dpi=dpi, compress_level=compress_level)
+
+    df = load_data(path)
+    data = count_categories(df) if name == 'cat' else heat_map_corr(df)
+    with stage('medical.savefig', figure=name):
+        return render_png(name, data, dpi, compress_level)
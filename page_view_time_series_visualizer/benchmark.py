@@ -0,0 +1,51 @@
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from time_series_visualizer import FIGSIZE, LinePyramid, plot_line
+
+
+# Gera uma série sintética de visualizações por segundo, com alguns picos isolados
+def synthetic_series(n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 50_000 + np.cumsum(rng.normal(0, 50, n_points)).astype(np.int64)
+    spikes = rng.integers(0, n_points, max(n_points // 100_000, 1))
+    values[spikes] += 100_000
+    index = pd.date_range('2019-01-01', periods=n_points, freq='s', name='date')
+    return pd.DataFrame({'value': values}, index=index)
+
+
+def render(data, lod):
+    # Tempo para desenhar e salvar o gráfico de linha, e tamanho do PNG gerado
+    start = time.perf_counter()
+    fig = Figure(figsize=FIGSIZE['line'])
+    FigureCanvasAgg(fig)
+    plot_line(fig, data, lod)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return time.perf_counter() - start, buffer.tell()
+
+
+if __name__ == '__main__':
+    # Uso: python benchmark.py [n_pontos ...]  (padrão: 10^4 a 10^7)
+    # O desenho sem LOD só é medido até 10^6 pontos, pois fica lento demais depois disso
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000, 10_000_000]
+
+    for n_points in sizes:
+        df = synthetic_series(n_points)
+
+        start = time.perf_counter()
+        pyramid = LinePyramid.from_frame(df)
+        build = time.perf_counter() - start
+
+        lod_time, lod_size = render(pyramid, lod=True)
+        line = f"{n_points:>12,} pontos | pirâmide: {build:6.2f}s | LOD: {lod_time:6.2f}s {lod_size / 1024:7.0f} KiB"
+        if n_points <= 1_000_000:
+            full_time, full_size = render(pyramid, lod=False)
+            line += f" | completo: {full_time:6.2f}s {full_size / 1024:7.0f} KiB"
+        print(line)
@@ -0,0 +1,291 @@
+import hashlib
+import io
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.cbook import boxplot_stats
+
+from time_series_visualizer import DATA_FILE, DEFAULT_COMPRESS_LEVEL, render_png
+import dataset_registry  # common/ já foi adicionado ao caminho por time_series_visualizer
+
+
+# Modo incremental do visualizador de visualizações de página
+#
+# O estado fica salvo em disco ao lado do CSV e guarda:
+# - quantos bytes do CSV já foram lidos (só as linhas novas são lidas depois)
+# - a série completa (datas e valores) para o gráfico de linha
+# - os valores ordenados de toda a série (limites de outliers de 2,5% e 97,5%)
+# - os valores ordenados de cada (ano, mês), de cada ano e de cada mês
+# - as médias mensais e os resumos dos box plots já calculados
+#
+# Como cada grupo guarda os valores ordenados, os dados "limpos" de um grupo
+# são sempre uma fatia contínua [limite inferior, limite superior]: os limites
+# (interpolados) mudam a cada nova leitura, mas só os grupos cuja fatia mudou,
+# isto é, em que algum valor cruzou um limite, são recalculados
+#
+# As figuras afetadas são desenhadas pelos templates de time_series_visualizer
+# (common/figure_pool.py), guardados no próprio módulo: em um processo que chama
+# refresh() repetidamente, cada figura é montada uma vez e depois só os dados
+# mudam (no box plot, só as caixas cujo resumo mudou)
+#
+# Limite de latência: depois de um append pequeno, a atualização do estado leva
+# poucos milissegundos, mas o mês e o ano das linhas novas mudam de média e de
+# resumo, então as três figuras mudam de fato e precisam ser rasterizadas e
+# codificadas em PNG de novo; esse custo do matplotlib (centenas de ms por
+# figura) domina o refresh
+
+def _state_path(path):
+    # fcc-forum-pageviews.csv -> .fcc-forum-pageviews.state.pkl
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, '.' + os.path.splitext(name)[0] + '.state.pkl')
+
+
+def _source_fingerprint(path, offset, block=64 * 1024):
+    # Identifica o trecho do CSV já consumido: inode do arquivo e hash do início
+    # (cabeçalho e primeiras linhas) e do fim do trecho (últimas linhas lidas)
+    # Se o arquivo for reescrito ou trocado (rotação), o estado salvo não serve mais,
+    # mesmo que o novo arquivo tenha o mesmo tamanho ou seja maior
+    with open(path, 'rb') as f:
+        head = f.read(min(block, offset))
+        f.seek(max(offset - block, 0))
+        tail = f.read(offset - max(offset - block, 0))
+        inode = os.fstat(f.fileno()).st_ino
+    return {
+        'inode': inode,
+        'head': hashlib.blake2b(head, digest_size=16).hexdigest(),
+        'tail': hashlib.blake2b(tail, digest_size=16).hexdigest()
+    }
+
+
+def _quantile_sorted(values, q):
+    # Percentil com interpolação linear (como Series.quantile) de um array já ordenado
+    pos = (len(values) - 1) * q
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, len(values) - 1)
+    a, b = values[lo], values[hi]
+    t = pos - lo
+    return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+
+
+class IncrementalPageViews:
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.offset = 0                                   # Bytes do CSV já consumidos
+        self.source = None                                # Impressão digital do trecho consumido
+        self.header = None
+        self.dates = np.empty(0, dtype='datetime64[ns]')  # Série completa, na ordem do arquivo
+        self.values = np.empty(0, dtype=np.int64)
+        self.sorted_values = np.empty(0, dtype=np.int64)  # Todos os valores, ordenados
+        self.groups = {'year_month': {}, 'year': {}, 'month': {}}  # Valores ordenados por grupo
+        self.bounds = None
+        self.slices = {}                                  # (tipo, chave) → fatia limpa do grupo
+        self.means = {}                                   # (ano, mês) → média mensal
+        self.box = {'year': {}, 'month': {}}              # Resumos dos box plots
+
+    # 1. Persistência do estado
+
+    @classmethod
+    def load(cls, path=DATA_FILE):
+        # Recupera o estado salvo, ou começa do zero se não houver estado válido
+        # (o CSV é procurado no diretório atual e depois na pasta raiz dos projetos)
+        path = dataset_registry.locate(path)
+        try:
+            with open(_state_path(path), 'rb') as f:
+                state = pickle.load(f)
+            if (isinstance(state, cls) and os.path.getsize(path) >= state.offset
+                    and state.source == _source_fingerprint(path, state.offset)):
+                state.path = path
+                return state
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+        return cls(path)
+
+    def save(self):
+        # Grava em um arquivo temporário e renomeia, para nunca deixar um estado pela metade
+        self.source = _source_fingerprint(self.path, self.offset)
+        target = _state_path(self.path)
+        with open(target + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(target + '.tmp', target)
+
+    # 2. Leitura apenas das linhas novas
+
+    def _read_new_rows(self):
+        with open(self.path, 'rb') as f:
+            if self.header is None:
+                self.header = f.readline().decode().strip().split(',')
+                self.offset = f.tell()
+            f.seek(self.offset)
+            data = f.read()
+
+        # Ignora uma última linha incompleta (ainda sendo escrita)
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offset += end
+        return pd.read_csv(io.BytesIO(data[:end]), names=self.header, parse_dates=['date'])
+
+    # 3. Atualização do estado
+
+    def update(self, new_rows):
+        # Incorpora novas linhas (colunas 'date' e 'value') e devolve
+        # o conjunto de figuras afetadas: 'line', 'bar' e/ou 'box'
+        if new_rows is None or len(new_rows) == 0:
+            return set()
+
+        dates = new_rows['date'].to_numpy(dtype='datetime64[ns]')
+        values = new_rows['value'].to_numpy(dtype=np.int64)
+        old_sorted = self.sorted_values
+        self.dates = np.concatenate([self.dates, dates])
+        self.values = np.concatenate([self.values, values])
+        self.sorted_values = _insert_sorted(self.sorted_values, values)
+
+        # Distribui os valores novos pelos grupos (ano, mês), ano e mês
+        index = pd.DatetimeIndex(dates)
+        keys = {
+            'year_month': list(zip(index.year, index.month)),
+            'year': list(index.year),
+            'month': list(index.month)
+        }
+        touched = set()
+        for kind, group_keys in keys.items():
+            frame = pd.DataFrame({'key': group_keys, 'value': values})
+            for key, part in frame.groupby('key', sort=False)['value']:
+                group = self.groups[kind]
+                group[key] = _insert_sorted(group.get(key, np.empty(0, dtype=np.int64)), part.to_numpy())
+                touched.add((kind, key))
+
+        # Novos limites de outliers (percentis 2,5% e 97,5% da série completa)
+        old_bounds = self.bounds
+        self.bounds = (_quantile_sorted(self.sorted_values, 0.025),
+                       _quantile_sorted(self.sorted_values, 0.975))
+
+        # Recalcula só os grupos que receberam valores ou cuja fatia limpa mudou
+        affected = set()
+        for kind, group in self.groups.items():
+            for key, sorted_group in group.items():
+                lo = np.searchsorted(sorted_group, self.bounds[0], side='left')
+                hi = np.searchsorted(sorted_group, self.bounds[1], side='right')
+                if (kind, key) not in touched and self.slices.get((kind, key)) == (lo, hi):
+                    continue
+                self.slices[(kind, key)] = (lo, hi)
+                clean = sorted_group[lo:hi]
+                if kind == 'year_month':
+                    self._set(self.means, key, clean.mean() if len(clean) else None, affected, 'bar')
+                else:
+                    stats = boxplot_stats(clean)[0] if len(clean) else None
+                    self._set(self.box[kind], key, stats, affected, 'box')
+
+        # O gráfico de linha muda se algum ponto novo é mantido ou se algum ponto antigo
+        # cruzou um dos limites (entrou ou saiu da faixa); só mover os limites não basta
+        kept_new = (values >= self.bounds[0]) & (values <= self.bounds[1])
+        if kept_new.any() or _kept_slice(old_sorted, old_bounds) != _kept_slice(old_sorted, self.bounds):
+            affected.add('line')
+        return affected
+
+    @staticmethod
+    def _set(table, key, value, affected, figure):
+        if value is None:
+            if table.pop(key, None) is not None:
+                affected.add(figure)
+            return
+        if key not in table or not _same(table[key], value):
+            table[key] = value
+            affected.add(figure)
+
+    # 4. Dados de cada figura, montados a partir do estado
+
+    def line_data(self):
+        keep = (self.values >= self.bounds[0]) & (self.values <= self.bounds[1])
+        return pd.DataFrame({'value': self.values[keep]},
+                            index=pd.DatetimeIndex(self.dates[keep], name='date'))
+
+    def bar_data(self):
+        # Mesmo formato do time_series_visualizer.bar_data: anos nas linhas, meses (1-12) nas colunas
+        means = pd.Series(self.means, dtype=float)
+        means.index = means.index.set_names(['year', 'month'])
+        return means.sort_index().unstack()
+
+    def box_stats(self):
+        return ({year: self.box['year'][year] for year in sorted(self.box['year'])},
+                {month: self.box['month'][month] for month in sorted(self.box['month'])})
+
+    # 5. Atualização completa: lê as linhas novas, atualiza o estado e redesenha o necessário
+
+    def refresh(self, output_dir='.', dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+        # Devolve o tempo (s) de cada etapa: atualização, cada figura redesenhada e gravação do estado
+        start = time.perf_counter()
+        affected = self.update(self._read_new_rows())
+        timings = {'update': time.perf_counter() - start}
+
+        # Figura → (arquivo, template de time_series_visualizer, dados)
+        renders = {
+            'line': ('line_plot', 'line', self.line_data),
+            'bar': ('bar_plot', 'bar', self.bar_data),
+            'box': ('box_plot', 'box_stats', self.box_stats)
+        }
+        for figure in sorted(affected):
+            name, template, data = renders[figure]
+            figure_start = time.perf_counter()
+            png = render_png(template, data(), dpi, compress_level)
+            with open(os.path.join(output_dir, name + '.png'), 'wb') as f:
+                f.write(png)
+            timings[name] = time.perf_counter() - figure_start
+
+        save_start = time.perf_counter()
+        self.save()
+        timings['save'] = time.perf_counter() - save_start
+        return timings
+
+
+def _kept_slice(sorted_values, bounds):
+    # Fatia [início, fim) dos valores ordenados que ficam dentro dos limites
+    if bounds is None:
+        return None
+    return (np.searchsorted(sorted_values, bounds[0], side='left'),
+            np.searchsorted(sorted_values, bounds[1], side='right'))
+
+
+def _insert_sorted(sorted_values, new_values):
+    # Insere novos valores em um array já ordenado, mantendo a ordenação
+    new_values = np.sort(new_values)
+    return np.insert(sorted_values, np.searchsorted(sorted_values, new_values), new_values)
+
+
+def _same(a, b):
+    # Compara médias (números) ou resumos de box plot (dicionários com arrays)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+def refresh(path=DATA_FILE, output_dir='.', dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    # Atalho: carrega o estado salvo, processa as linhas novas e redesenha as figuras afetadas
+    start = time.perf_counter()
+    state = IncrementalPageViews.load(path)
+    loaded = time.perf_counter() - start
+    return {'load': loaded, **state.refresh(output_dir, dpi, compress_level)}
+
+
+if __name__ == '__main__':
+    # Uso: python incremental.py [arquivo.csv] [pasta_de_saída] [intervalo_em_s]
+    # Fica em execução e faz um refresh sempre que o CSV muda de tamanho: os templates
+    # das figuras continuam em memória entre um refresh e outro
+    import sys
+
+    path = dataset_registry.locate(sys.argv[1] if len(sys.argv) > 1 else DATA_FILE)
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else '.'
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    size = None
+    while True:
+        if os.path.getsize(path) != size:
+            size = os.path.getsize(path)
+            start = time.perf_counter()
+            timings = refresh(path, output_dir)
+            stages = ' | '.join(f'{name} {seconds * 1e3:.0f} ms' for name, seconds in timings.items())
+            print(f"refresh: {(time.perf_counter() - start) * 1e3:.0f} ms ({stages})", flush=True)
+        time.sleep(interval)
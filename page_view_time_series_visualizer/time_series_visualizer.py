@@ -1,43 +1,202 @@
+import functools
+import os
+import sys
+
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns 
+import seaborn as sns
+from matplotlib.cbook import boxplot_stats
 from pandas.plotting import register_matplotlib_converters
 
+# Módulos compartilhados (common/): registro dos conjuntos de dados, pool de figuras
+# e instrumentação opcional das etapas
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+import dataset_registry
+from figure_pool import DEFAULT_COMPRESS_LEVEL, FigurePool, FigureTemplate
+from instrumentation import stage, traced
+
 # Registra os conversores de data do pandas para o matplotlib (evita avisos de compatibilidade)
 register_matplotlib_converters()
 
 
+DATA_FILE = 'fcc-forum-pageviews.csv'
+
+# Tamanho de cada figura (em polegadas)
+FIGSIZE = {
+    'line': (16, 6),
+    'bar': (15, 10),
+    'box': (20, 8)
+}
+
+
+# Nomes dos meses em ordem de calendário (índice 0 = janeiro)
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+MONTH_ABBR = [name[:3] for name in MONTH_NAMES]
+
+
+# Atributos de calendário, calculados uma única vez por conjunto de dados
+# e reaproveitados pelos três gráficos
+# - year: ano (int16)
+# - month: mês de 1 a 12 (int8)
+# - month_abbr: abreviação do mês como categoria ordenada (Jan < Feb < ... < Dec)
+# Tudo vem direto do DatetimeIndex, sem laços em Python nem strftime
+
+@traced('page_views.calendar_features')
+def calendar_features(df):
+    month = df.index.month.to_numpy().astype('int8')
+    return df.assign(
+        year=df.index.year.to_numpy().astype('int16'),
+        month=month,
+        month_abbr=pd.Categorical.from_codes(month - 1, categories=MONTH_ABBR, ordered=True)
+    )
+
+
+def _with_calendar(df):
+    # Só calcula os atributos se o DataFrame ainda não os tiver
+    return df if 'month_abbr' in df.columns else calendar_features(df)
 
-# Lê o arquivo CSV contendo as visualizações de página do fórum da freeCodeCamp
-# - parse_dates=['date']: converte a coluna 'date' para o tipo datetime
-# - index_col='date': define a coluna 'date' como índice do DataFrame
-df = pd.read_csv('fcc-forum-pageviews.csv',
-                 parse_dates=['date'],
-                 index_col='date')
 
+# Carregamento preguiçoso (lazy) dos dados
+# O arquivo só é lido na primeira vez em que os dados são necessários,
+# e o resultado fica guardado em memória para as chamadas seguintes
+# (por versão do arquivo: se o CSV mudar, ele é lido de novo)
 
-# Limpeza dos dados:
-# Mantém apenas os valores entre os percentis de 2,5% e 97,5%, removendo outliers (valores extremos)
-df = df[(df['value'] >= df['value'].quantile(0.025)) &
-        (df['value'] <= df['value'].quantile(0.975))]
+def load_data(path=DATA_FILE):
+    return _load_data(*dataset_registry.file_version(path))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_data(path, size, mtime_ns):
+    # Lê o arquivo CSV contendo as visualizações de página do fórum da freeCodeCamp
+    # pelo registro de conjuntos de dados (colunas mapeadas do cache em disco)
+    # - a coluna 'date' já vem como datetime e vira o índice do DataFrame
+    df = dataset_registry.frame('page_views', path, index='date')
+
+
+    # Limpeza dos dados:
+    # Mantém apenas os valores entre os percentis de 2,5% e 97,5%, removendo outliers (valores extremos)
+    with stage('page_views.clean', rows=len(df)):
+        df = df[(df['value'] >= df['value'].quantile(0.025)) &
+                (df['value'] <= df['value'].quantile(0.975))]
+
+    return calendar_features(df)
+
+
+def __getattr__(name):
+    # Mantém o acesso a time_series_visualizer.df, mas sem ler o arquivo na importação
+    if name == 'df':
+        return load_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Função 1: Gráfico de linha (tendência temporal)
 
-def draw_line_plot():
-    # Cria uma figura e eixos com tamanho 16x6 polegadas
-    fig, ax = plt.subplots(figsize=(16, 6))
+class LinePyramid:
+    # Pirâmide de níveis de detalhe (LOD) de uma série para o gráfico de linha
+    # - Nível 0: todos os pontos
+    # - Nível k: a série dividida em blocos de 2^k pontos, guardando o índice
+    #   do mínimo e do máximo de cada bloco
+    # Desenhar o mínimo e o máximo de cada bloco mantém os picos visíveis,
+    # mesmo quando a série tem muito mais pontos do que a figura tem pixels
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+        # Cada nível é construído juntando blocos vizinhos do nível anterior
+        imin = imax = np.arange(len(self.y))
+        self.levels = [(imin, imax)]
+        while len(imin) > 1:
+            if len(imin) % 2:
+                imin = np.append(imin, imin[-1])
+                imax = np.append(imax, imax[-1])
+            left_min, right_min = imin[0::2], imin[1::2]
+            left_max, right_max = imax[0::2], imax[1::2]
+            imin = np.where(self.y[left_min] <= self.y[right_min], left_min, right_min)
+            imax = np.where(self.y[left_max] >= self.y[right_max], left_max, right_max)
+            self.levels.append((imin, imax))
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df.index.to_numpy(), df['value'].to_numpy())
+
+    def points(self, max_buckets):
+        # Pontos a desenhar: o nível mais detalhado com no máximo max_buckets blocos
+        for imin, imax in self.levels:
+            if len(imin) <= max_buckets:
+                break
+        if imin is imax:
+            index = imin
+        else:
+            index = np.union1d(imin, imax)
+        return self.x[index], self.y[index]
+
+
+def line_pyramid(path=DATA_FILE):
+    # Pirâmide calculada uma única vez por versão do conjunto de dados
+    return _line_pyramid(*dataset_registry.file_version(path))
+
+
+@functools.lru_cache(maxsize=8)
+@traced('page_views.line_pyramid')
+def _line_pyramid(path, size, mtime_ns):
+    return LinePyramid.from_frame(_load_data(path, size, mtime_ns))
+
+
+def line_points(path=DATA_FILE, dpi=None):
+    # Pontos já reduzidos do gráfico de linha (x, y), para uma figura do tamanho
+    # padrão salva com "dpi" (None = o dpi padrão das figuras); pequenos o bastante
+    # para serem enviados a outro processo, que os desenha sem recalcular nada
+    width = FIGSIZE['line'][0] * (dpi or plt.rcParams['figure.dpi'])
+    return line_pyramid(path).points(int(width))
+
+
+def _line_points(fig, df, lod, dpi=None):
+    # Pontos da linha: no máximo um bloco (mínimo e máximo) por pixel de largura da imagem
+    # - df: DataFrame, LinePyramid ou pontos (x, y) já reduzidos por line_points
+    # - dpi: resolução com que a figura vai ser salva (None = a da própria figura)
+    if isinstance(df, tuple):
+        return df
+    pyramid = df if isinstance(df, LinePyramid) else LinePyramid.from_frame(df)
+    if lod:
+        return pyramid.points(int(fig.get_figwidth() * (dpi or fig.dpi)))
+    return pyramid.x, pyramid.y
+
+
+@traced('page_views.plot_line')
+def plot_line(fig, df, lod=True, dpi=None):
+    # Desenha o gráfico de linha em uma figura já criada (pyplot ou Figure do matplotlib)
+    # - df: DataFrame com a coluna 'value', uma LinePyramid já calculada ou pontos de line_points
+    # - lod: desenha no máximo um bloco (mínimo e máximo) por pixel de largura da imagem
+    # - dpi: resolução com que a figura vai ser salva (None = a da própria figura)
+    ax = fig.subplots()
+    x, y = _line_points(fig, df, lod, dpi)
 
     # Plota a linha com as visualizações diárias ao longo do tempo
-    ax.plot(df.index, df['value'], color='red', linewidth=1)
+    ax.plot(x, y, color='red', linewidth=1)
 
     # Define título e rótulos dos eixos
     ax.set_title('Daily freeCodeCamp Forum Page Views 5/2016-12/2019')
     ax.set_xlabel('Date')
     ax.set_ylabel('Page Views')
 
+
+def draw_line_plot(lod=True):
+    # Cria uma figura com tamanho 16x6 polegadas e desenha o gráfico
+    fig = plt.figure(figsize=FIGSIZE['line'])
+    plot_line(fig, line_pyramid() if lod else load_data(), lod)
+
     # Salva o gráfico como arquivo de imagem
-    plt.savefig('line_plot.png')
+    with stage('page_views.savefig', figure='line_plot'):
+        fig.savefig('line_plot.png')
+
+    # Fecha a figura no pyplot (ela continua utilizável por quem a recebe),
+    # para que chamadas repetidas não acumulem figuras na memória
+    plt.close(fig)
 
     # Retorna o objeto da figura para possível uso posterior (exibição ou teste)
     return fig
@@ -45,56 +204,64 @@ def draw_line_plot():
 
 # Função 2: Gráfico de barras (média mensal por ano)
 
-def draw_bar_plot():
-    # Cria uma cópia dos dados originais
-    df_bar = df.copy()
-
-    # Cria colunas separadas de ano e mês a partir do índice (que contém datas)
-    df_bar['year'] = df_bar.index.year
-    df_bar['month'] = df_bar.index.month_name()
-
-
-    # Agrupa os dados por ano e mês e calcula a média de visualizações
-    # Em seguida, "desempilha" os meses para que cada coluna represente um mês
-    df_bar = df_bar.groupby(['year', 'month'])['value'].mean().unstack()
+@traced('page_views.bar_data')
+def bar_data(df):
+    # Agrupa os dados por ano e mês (códigos inteiros) e calcula a média de visualizações
+    # Em seguida, "desempilha" os meses para que cada coluna represente um mês,
+    # já na ordem do calendário (1 = janeiro, ..., 12 = dezembro)
+    df_bar = _with_calendar(df)
+    return df_bar.groupby(['year', 'month'])['value'].mean().unstack()
 
 
+@traced('page_views.plot_bar')
+def plot_bar(fig, df_bar):
     # Cria o gráfico de barras a partir do DataFrame agrupado
-    fig = df_bar.plot(kind='bar', figsize=(15, 10)).figure
+    ax = fig.subplots()
+    df_bar.plot(kind='bar', ax=ax)
 
 
     # Adiciona rótulos e título
-    plt.xlabel('Years')
-    plt.ylabel('Average Page Views')
-    plt.title('Average Daily Page Views by Month and Year')
+    ax.set_xlabel('Years')
+    ax.set_ylabel('Average Page Views')
+    ax.set_title('Average Daily Page Views by Month and Year')
 
 
     # Ajusta a legenda com os nomes dos meses em ordem
-    plt.legend(title='Months',
-               labels=['January', 'February', 'March', 'April', 'May', 'June',
-                       'July', 'August', 'September', 'October', 'November', 'December'])
+    ax.legend(title='Months',
+              labels=[MONTH_NAMES[month - 1] for month in df_bar.columns])
+
+
+def draw_bar_plot():
+    fig = plt.figure(figsize=FIGSIZE['bar'])
+    plot_bar(fig, bar_data(load_data()))
 
     # Salva o gráfico como imagem
-    plt.savefig('bar_plot.png')
+    with stage('page_views.savefig', figure='bar_plot'):
+        fig.savefig('bar_plot.png')
+    plt.close(fig)
     return fig
 
 
 # Função 3: Gráficos de caixa (box plots)
-def draw_box_plot():
-    # Cria uma cópia dos dados originais
-    df_box = df.copy()
 
-    # Reseta o índice para transformar a data em uma coluna normal
-    df_box.reset_index(inplace=True)
+@traced('page_views.box_data')
+def box_data(df):
+    # Transforma a data (índice) em uma coluna normal e usa os atributos
+    # de calendário já calculados: ano inteiro e mês como categoria ordenada
+    df_box = _with_calendar(df).reset_index()
+    return df_box.rename(columns={'month': 'month_num', 'month_abbr': 'month'})
 
-    # Cria colunas separadas de ano e mês (abreviação do mês)
-    df_box['year'] = [d.year for d in df_box.date]
-    df_box['month'] = [d.strftime('%b') for d in df_box.date]
 
+@traced('page_views.plot_box')
+def plot_box(fig, df_box):
     # Cria dois gráficos de caixa lado a lado
-    fig, axes = plt.subplots(1, 2, figsize=(20, 8))
+    axes = fig.subplots(1, 2)
+    _box_panels(axes, df_box)
 
 
+def _box_panels(axes, df_box):
+    # Desenha os dois box plots em eixos já criados (também usado pelo BoxTemplate)
+
     # 1º Gráfico: por ano (tendência anual)
     sns.boxplot(x='year', y='value', data=df_box, ax=axes[0])
     axes[0].set_title('Year-wise Box Plot (Trend)')  # Título
@@ -103,14 +270,208 @@ def draw_box_plot():
 
 
     # 2º Gráfico: por mês (sazonalidade)
-    month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-    sns.boxplot(x='month', y='value', data=df_box, order=month_order, ax=axes[1])
+    sns.boxplot(x='month', y='value', data=df_box, order=MONTH_ABBR, ax=axes[1])
     axes[1].set_title('Month-wise Box Plot (Seasonality)')  # Título
     axes[1].set_xlabel('Month')                            # Eixo X
     axes[1].set_ylabel('Page Views')                       # Eixo Y
 
+
+@traced('page_views.box_stats')
+def box_stats(df):
+    # Resumos dos box plots (matplotlib.cbook.boxplot_stats) por ano e por mês (1-12),
+    # no formato aceito pelo plot_box_stats: poucos números por caixa, em vez das linhas
+    df = _with_calendar(df)
+    return tuple(
+        {int(key): boxplot_stats(part.to_numpy())[0] for key, part in df.groupby(col)['value']}
+        for col in ('year', 'month')
+    )
+
+
+@traced('page_views.plot_box_stats')
+def plot_box_stats(fig, year_stats, month_stats):
+    # Mesmo gráfico do plot_box, mas a partir de resumos já calculados
+    # (dicionários de matplotlib.cbook.boxplot_stats por ano e por mês),
+    # sem precisar de todas as linhas dos dados
+    # Retorna os artistas de cada caixa (usados pelo BoxStatsTemplate)
+    return _box_stats_panels(fig.subplots(1, 2), year_stats, month_stats)
+
+
+def _box_stats_panels(axes, year_stats, month_stats):
+    # Desenha os dois box plots a partir dos resumos
+    # Retorna, para cada gráfico, a lista dos artistas de cada caixa
+    panels = [
+        (axes[0], year_stats, str, 'Year-wise Box Plot (Trend)', 'Year'),
+        (axes[1], month_stats, lambda month: MONTH_ABBR[month - 1], 'Month-wise Box Plot (Seasonality)', 'Month')
+    ]
+    artists = []
+    for ax, stats, label, title, xlabel in panels:
+        artists.append(_bxp(ax, [dict(summary, label=label(key)) for key, summary in stats.items()]))
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Page Views')
+    return artists
+
+
+def _bxp(ax, summaries, positions=None, manage_ticks=True):
+    # Caixas no mesmo estilo do seaborn, nas posições 1, 2, ... (ou "positions")
+    # - manage_ticks=False: mantém as marcas do eixo x já criadas (o bxp somaria as novas às antigas)
+    # Retorna a lista dos artistas de cada caixa (bigodes, limites, caixa, mediana, outliers)
+    color = sns.desaturate(sns.color_palette()[0], 0.75)
+    line = {'color': '0.25'}
+    drawn = ax.bxp(summaries, positions=positions, widths=0.8, patch_artist=True, manage_ticks=manage_ticks,
+                   boxprops={'facecolor': color, 'edgecolor': '0.25'},
+                   whiskerprops=line, capprops=line, medianprops=line,
+                   flierprops={'markeredgecolor': '0.25'})
+    return [[*drawn['whiskers'][2 * i:2 * i + 2], *drawn['caps'][2 * i:2 * i + 2],
+             drawn['boxes'][i], drawn['medians'][i], drawn['fliers'][i]]
+            for i in range(len(summaries))]
+
+
+def _same_summary(a, b):
+    # Compara dois resumos de boxplot_stats (dicionários com números e arrays)
+    return a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+
+
+def draw_box_plot():
+    fig = plt.figure(figsize=FIGSIZE['box'])
+    plot_box(fig, box_data(load_data()))
+
     # Salva os gráficos como imagem
-    plt.savefig('box_plot.png')
+    with stage('page_views.savefig', figure='box_plot'):
+        fig.savefig('box_plot.png')
+    plt.close(fig)
     return fig
+
+
+# Renderização rápida para relatórios repetidos (common/figure_pool.py)
+# Cada gráfico vira um template: a figura é montada uma vez e, nas chamadas
+# seguintes, só os dados da linha, as alturas das barras ou as caixas mudam
+
+class LineTemplate(FigureTemplate):
+    figsize = FIGSIZE['line']
+
+    def build(self, data):
+        # - data: DataFrame com a coluna 'value' ou uma LinePyramid já calculada
+        plot_line(self.figure, data, dpi=self.dpi)
+        self.ax = self.figure.axes[0]
+        self.line = self.ax.lines[0]
+
+    def matches(self, data):
+        return True
+
+    def update(self, data):
+        self.line.set_data(*_line_points(self.figure, data, True, self.dpi))
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
+class BarTemplate(FigureTemplate):
+    figsize = FIGSIZE['bar']
+
+    def build(self, df_bar):
+        plot_bar(self.figure, df_bar)
+        self.ax = self.figure.axes[0]
+        self.index = list(df_bar.index)
+        self.columns = list(df_bar.columns)
+
+    def matches(self, df_bar):
+        # Mesmos anos (posições no eixo x) e mesmos meses (legenda)
+        return list(df_bar.index) == self.index and list(df_bar.columns) == self.columns
+
+    def update(self, df_bar):
+        # Um grupo de barras (container) por mês; meses sem dados ficam com altura 0, como no pandas
+        for container, month in zip(self.ax.containers, self.columns):
+            for bar, value in zip(container, np.nan_to_num(df_bar[month].to_numpy())):
+                bar.set_height(value)
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=False)
+
+
+class BoxTemplate(FigureTemplate):
+    # As caixas (quartis, bigodes e outliers) mudam de forma com os dados, então são
+    # redesenhadas; eixos, títulos e rótulos da figura são reaproveitados
+    figsize = FIGSIZE['box']
+
+    def build(self, df_box):
+        plot_box(self.figure, df_box)
+        self.axes = self.figure.axes
+        self.years = sorted(df_box['year'].unique())
+
+    def matches(self, df_box):
+        return sorted(df_box['year'].unique()) == self.years
+
+    def update(self, df_box):
+        for ax in self.axes:
+            for artist in [*ax.lines, *ax.patches, *ax.collections]:
+                artist.remove()
+            ax.containers.clear()
+            # O seaborn pega a próxima cor do ciclo dos eixos: volta ao início para repetir a mesma cor
+            ax.set_prop_cycle(None)
+        _box_panels(self.axes, df_box)
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+
+
+class BoxStatsTemplate(FigureTemplate):
+    # Box plots a partir dos resumos de box_stats: só as caixas cujo resumo mudou
+    # são redesenhadas (no modo incremental, em geral só as do último ano e mês),
+    # e eixos, títulos, rótulos e as demais caixas são reaproveitados
+    figsize = FIGSIZE['box']
+
+    def build(self, stats):
+        self.artists = plot_box_stats(self.figure, *stats)
+        self.axes = self.figure.axes
+        self.stats = stats
+
+    def matches(self, stats):
+        return [list(summaries) for summaries in stats] == [list(summaries) for summaries in self.stats]
+
+    def update(self, stats):
+        for ax, artists, old, new in zip(self.axes, self.artists, self.stats, stats):
+            # Mesmas caixas nas mesmas posições: as marcas, os rótulos e os limites
+            # do eixo x continuam valendo (só o eixo y é reajustado aos novos resumos)
+            xlim = ax.get_xlim()
+            for i, key in enumerate(new):
+                if _same_summary(old[key], new[key]):
+                    continue
+                for artist in artists[i]:
+                    artist.remove()
+                artists[i] = _bxp(ax, [new[key]], positions=[i + 1], manage_ticks=False)[0]
+            ax.set_xlim(xlim)
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self.stats = stats
+
+
+TEMPLATES = {'line': LineTemplate, 'bar': BarTemplate, 'box': BoxTemplate, 'box_stats': BoxStatsTemplate}
+POOL = FigurePool()
+
+
+def render_png(name, data, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL, pool=POOL):
+    # PNG em memória de uma figura a partir dos dados já preparados
+    # - name: 'line' (DataFrame, LinePyramid ou line_points), 'bar' (bar_data),
+    #   'box' (box_data) ou 'box_stats' (box_stats)
+    if name not in TEMPLATES:
+        raise ValueError(f"Figura desconhecida: {name}")
+    return pool.render(name, TEMPLATES[name], data, dpi, compress_level)
+
+
+# PNG em memória (bytes) de uma figura, sem passar pelo pyplot nem gravar em disco
+# Com um cache (common/result_cache.py), os bytes são reaproveitados enquanto
+# o CSV e o código não mudarem, sem ler nem analisar os dados novamente
+
+def figure_png(name, path=DATA_FILE, cache=None, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    # - name: 'line', 'bar' ou 'box'
+    path = dataset_registry.locate(path)
+    if cache is not None:
+        return cache.memoize(figure_png, [path], name, path, dpi=dpi, compress_level=compress_level)
+
+    if name == 'line':
+        data = line_pyramid(path)
+    elif name == 'bar':
+        data = bar_data(load_data(path))
+    else:
+        data = box_data(load_data(path))
+    with stage('page_views.savefig', figure=name):
+        return render_png(name, data, dpi, compress_level)
@@ -0,0 +1,53 @@
+import importlib
+import resource
+import sys
+import time
+
+from render_scheduler import prepare_jobs
+from figure_pool import FigurePool  # common/ já foi adicionado ao caminho pelos visualizadores
+
+
+# Compara, figura a figura, o desenho de relatórios repetidos (no mesmo processo):
+# - do zero: cada relatório monta a figura inteira (o pool é limpo a cada relatório)
+# - com templates: a figura é montada uma vez e só os dados são trocados
+# e mostra o crescimento da memória residente (RSS) ao longo das renderizações
+# Roda no diretório com medical_examination.csv e fcc-forum-pageviews.csv
+
+def _rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def render_all(jobs, pool, renders, compress_level, fresh=False):
+    for _ in range(renders):
+        for name, module, figure, data, path, dpi, _ in jobs:
+            importlib.import_module(module).render_png(figure, data, dpi, compress_level, pool=pool)
+        if fresh:
+            pool.clear()
+
+
+if __name__ == '__main__':
+    # Uso: python benchmark.py [n_relatórios] [compress_level]
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    compress_level = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    jobs = prepare_jobs()
+
+    for name, module, figure, data, path, dpi, _ in jobs:
+        job = [(name, module, figure, data, path, dpi, compress_level)]
+        timings = {}
+        for mode, fresh in (('do zero', True), ('templates', False)):
+            pool = FigurePool()
+            render_all(job, pool, 1, compress_level)  # Aquecimento (importações, fontes)
+            start = time.perf_counter()
+            render_all(job, pool, renders, compress_level, fresh)
+            timings[mode] = (time.perf_counter() - start) / renders
+            pool.clear()
+        print(f"{name:<10} | do zero: {timings['do zero'] * 1000:8.1f}ms"
+              f" | templates: {timings['templates'] * 1000:8.1f}ms"
+              f" ({timings['do zero'] / timings['templates']:4.1f}x)")
+
+    # Memória: relatórios completos com o mesmo pool
+    pool = FigurePool()
+    render_all(jobs, pool, 1, compress_level)
+    before = _rss_mib()
+    render_all(jobs, pool, renders, compress_level)
+    print(f"RSS após {renders} relatórios: {before:.1f} → {_rss_mib():.1f} MiB | {pool.stats()}")
@@ -0,0 +1,24 @@
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from render_scheduler import prepare_jobs, render_jobs
+
+if __name__ == '__main__':
+    # Uso: python main.py [n_processos] [n_relatorios]
+    # Com vários relatórios, os mesmos processos desenham todos eles e reaproveitam as figuras
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    reports = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for report in range(reports):
+            start = time.perf_counter()
+            jobs = prepare_jobs()
+            prepared = time.perf_counter()
+            timings = render_jobs(jobs, executor=executor)
+            done = time.perf_counter()
+
+            # Exibe o tempo de cada figura e o total
+            for timing in timings:
+                print(f"{timing['figure']:<10} {timing['seconds']:6.2f}s (pid {timing['pid']}) → {timing['path']}")
+            print(f"relatório {report + 1}: preparação: {prepared - start:.2f}s | desenho: {done - prepared:.2f}s")
@@ -0,0 +1,90 @@
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Os visualizadores ficam em pastas irmãs desta; adiciona-as ao caminho de importação
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('medical_data_visualizer', 'page_view_time_series_visualizer'):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import medical_data_visualizer as medical
+import time_series_visualizer as page_views
+from instrumentation import stage  # common/ já foi adicionado ao caminho pelos visualizadores
+
+
+# Figuras de cada relatório: nome do arquivo → (módulo, figura no render_png do módulo)
+# Cada render_png recebe os dados já agregados e devolve os bytes do PNG, reaproveitando
+# os templates de figura (common/figure_pool.py) que já existirem no processo
+FIGURES = {
+    'catplot': ('medical_data_visualizer', 'cat'),
+    'heatmap': ('medical_data_visualizer', 'heat'),
+    'line_plot': ('time_series_visualizer', 'line'),
+    'bar_plot': ('time_series_visualizer', 'bar'),
+    'box_plot': ('time_series_visualizer', 'box_stats')
+}
+
+
+# 1. Preparação dos dados (no processo principal, uma única vez por relatório)
+
+def prepare_jobs(output_dir='.', medical_path=medical.DATA_FILE, page_view_path=page_views.DATA_FILE,
+                 dpi=None, compress_level=medical.DEFAULT_COMPRESS_LEVEL):
+    # Carrega e agrega os dados de um relatório e devolve uma tarefa por figura
+    # Só dados já reduzidos (pequenos) são enviados aos processos de desenho:
+    # tabelas agregadas, os pontos do gráfico de linha já reduzidos para a largura
+    # da imagem e os resumos (quartis, bigodes, outliers) de cada caixa dos box plots
+    # - dpi / compress_level: resolução e nível de compressão (0-9) dos PNGs
+    df_medical = medical.load_data(medical_path)
+    df_page_views = page_views.load_data(page_view_path)
+
+    data = {
+        'catplot': medical.count_categories(df_medical),
+        'heatmap': medical.heat_map_corr(df_medical),
+        'line_plot': page_views.line_points(page_view_path, dpi),
+        'bar_plot': page_views.bar_data(df_page_views),
+        'box_plot': page_views.box_stats(df_page_views)
+    }
+    return [
+        (name, module, figure, data[name], os.path.join(output_dir, name + '.png'), dpi, compress_level)
+        for name, (module, figure) in FIGURES.items()
+    ]
+
+
+# 2. Desenho de uma figura (executado em um processo do pool)
+
+def _render(job):
+    name, module, figure, data, path, dpi, compress_level = job
+    start, cpu_start = time.perf_counter(), time.process_time()
+
+    # Figuras orientadas a objetos (backend Agg, fora do pyplot), reaproveitadas
+    # entre relatórios enquanto o processo de desenho continuar vivo
+    with stage('report.render', figure=name):
+        png = importlib.import_module(module).render_png(figure, data, dpi, compress_level)
+    with open(path, 'wb') as f:
+        f.write(png)
+
+    return {
+        'figure': name,
+        'path': path,
+        'seconds': time.perf_counter() - start,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'pid': os.getpid()
+    }
+
+
+# 3. Distribuição das tarefas entre os processos
+
+def render_jobs(jobs, max_workers=None, executor=None):
+    # Desenha todas as figuras em paralelo e devolve o tempo de cada uma
+    # (na mesma ordem das tarefas recebidas)
+    # - executor: pool de processos já aberto; mantê-lo entre relatórios faz com que
+    #   cada processo reaproveite as figuras montadas nos relatórios anteriores
+    if executor is not None:
+        return list(executor.map(_render, jobs))
+    if max_workers == 1:
+        return [_render(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render, jobs))
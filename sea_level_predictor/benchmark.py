@@ -0,0 +1,52 @@
+import sys
+import time
+
+import numpy as np
+from scipy.stats import linregress
+
+from regression import PrefixRegression
+
+
+# Gera séries sintéticas de nível do mar para várias estações (com algumas lacunas)
+def synthetic_stations(n_stations, n_years, seed=0):
+    rng = np.random.default_rng(seed)
+    years = np.arange(1880, 1880 + n_years)
+    trend = rng.uniform(0.03, 0.2, (n_stations, 1)) * (years - 1880)
+    levels = trend + np.cumsum(rng.normal(0, 0.2, (n_stations, n_years)), axis=1)
+    levels[rng.random(levels.shape) < 0.05] = np.nan
+    return years, levels
+
+
+def fit_loop(years, levels):
+    # Referência: um linregress por estação e por ano inicial
+    for station in levels:
+        for start in range(len(years) - 1):
+            keep = ~np.isnan(station[start:])
+            if keep.sum() >= 2:
+                linregress(years[start:][keep], station[start:][keep])
+
+
+def fit_engine(years, levels):
+    return PrefixRegression(years, levels).all_start_years()
+
+
+if __name__ == '__main__':
+    # Uso: python benchmark.py [n_estações ...]  (padrão: 1, 10, 100 e 1000 estações de 144 anos)
+    # O laço com linregress só é medido até 100 estações, pois fica lento demais depois disso
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000]
+
+    for n_stations in sizes:
+        years, levels = synthetic_stations(n_stations, 144)
+        n_fits = n_stations * (len(years) - 1)
+
+        start = time.perf_counter()
+        fit_engine(years, levels)
+        engine = time.perf_counter() - start
+        line = f"{n_stations:>6} estações | {n_fits:>9,} retas | somas prefixadas: {engine * 1000:8.2f}ms"
+
+        if n_stations <= 100:
+            start = time.perf_counter()
+            fit_loop(years, levels)
+            loop = time.perf_counter() - start
+            line += f" | linregress: {loop * 1000:9.2f}ms ({loop / engine:5.0f}x)"
+        print(line)
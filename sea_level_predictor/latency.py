@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+# Mede o custo de "partida a frio" (como em um worker serverless novo) de cada caminho:
+# - importação: tempo do "import" do módulo (e de tudo o que ele importa)
+# - chamada: primeira chamada (fria) e média das chamadas seguintes (quentes)
+# Cada medida roda em um processo novo, para não reaproveitar módulos já importados
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA = os.path.join(os.path.dirname(HERE), 'epa-sea-level.csv')
+
+CASES = {
+    'prediction (sem gráficos)': (
+        'import prediction',
+        'prediction.predict_sea_level(path=DATA)'
+    ),
+    'sea_level_predictor (PNG)': (
+        'import sea_level_predictor',
+        'sea_level_predictor.figure_png(DATA)'
+    )
+}
+
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+DATA = {data!r}
+{call}
+first = time.perf_counter()
+for _ in range({repeat}):
+    {call}
+warm = (time.perf_counter() - first) / {repeat}
+print(imported - start, first - imported, warm)
+'''
+
+
+def measure(imports, call, repeat=20):
+    script = SCRIPT.format(imports=imports, call=call, data=DATA, repeat=repeat)
+    output = subprocess.run([sys.executable, '-c', script], cwd=HERE, capture_output=True, text=True, check=True)
+    return tuple(map(float, output.stdout.split()))
+
+
+if __name__ == '__main__':
+    # Uso: python latency.py [repetições]  (padrão: 5 processos por caso, mostra a mediana)
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for name, (imports, call) in CASES.items():
+        results = sorted(measure(imports, call) for _ in range(runs))
+        import_time, cold, warm = results[runs // 2]
+        print(f"{name:<28} | importação: {import_time * 1000:7.1f}ms | 1ª chamada: {cold * 1000:7.1f}ms"
+              f" | chamadas seguintes: {warm * 1000:7.2f}ms | partida a frio: {(import_time + cold) * 1000:7.1f}ms")
@@ -0,0 +1,87 @@
+import functools
+import os
+import sys
+
+import numpy as np
+
+from regression import PrefixRegression, predict
+
+# Registro dos conjuntos de dados e instrumentação opcional das etapas (common/)
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+import dataset_registry
+from instrumentation import traced
+
+
+# Previsões do nível do mar sem gráficos
+#
+# Este módulo só depende do numpy (nem pandas, nem matplotlib, nem scipy), para
+# que uma resposta de API com o nível projetado para 2050 não pague o custo de
+# importar as bibliotecas de gráficos. O desenho (sea_level_predictor.py) usa
+# as mesmas funções de ajuste daqui
+#
+# Os dados vêm do cache colunar de common/dataset_registry.py: só a primeira leitura de
+# cada versão do CSV (a conversão) usa o pandas
+
+DATA_FILE = 'epa-sea-level.csv'
+
+# Anos iniciais das duas linhas de tendência e ano final da projeção
+FIT_STARTS = (1880, 2000)
+PROJECT_TO = 2050
+
+# Série medida e limites do intervalo de confiança de cada medição
+SERIES = ('CSIRO Adjusted Sea Level', 'Lower Error Bound', 'Upper Error Bound')
+
+
+@traced('sea_level.read_series')
+def read_series(path=DATA_FILE, columns=SERIES):
+    # Lê os anos e as colunas pedidas do CSV (pelo registro de conjuntos de dados,
+    # que mapeia as colunas do cache em disco); campos vazios viram NaN
+    # Retorna (anos (n,), valores (colunas, n))
+    data = dataset_registry.arrays('sea_level', path)
+    missing = [col for col in columns if col not in data]
+    if missing:
+        raise ValueError(f"Colunas desconhecidas: {', '.join(missing)}")
+    return data['Year'], np.vstack([data[col] for col in columns])
+
+
+@functools.lru_cache(maxsize=8)
+def _load(path, size, mtime_ns):
+    # Dados e somas prefixadas ficam em memória entre chamadas (workers "quentes"),
+    # por versão do arquivo: se o CSV mudar, ele é lido de novo
+    # Séries: nível medido e meia largura do intervalo de confiança de cada medição
+    years, (level, lower, upper) = read_series(path)
+    return PrefixRegression(years, np.vstack([level, (upper - lower) / 2]))
+
+
+def fit_trends(years, levels, starts=FIT_STARTS):
+    # Retas (slope, intercept) de cada ano inicial até o fim da série
+    # - levels (n,) → arrays (inícios,); levels (séries, n) → arrays (séries, inícios)
+    return PrefixRegression(years, levels).fit_from_years(starts)
+
+
+@traced('sea_level.predict')
+def predict_sea_level(year=PROJECT_TO, path=DATA_FILE, starts=FIT_STARTS):
+    # Coeficientes e nível projetado em "year" para cada linha de tendência, com uma
+    # faixa de confiança: projeção ± a meia largura média do intervalo entre os limites
+    # (Lower/Upper Error Bound) das medições usadas no ajuste
+    # ex.: [{'start': 1880, 'slope': 0.063, 'intercept': -118.7, 'year': 2050,
+    #        'level': 10.15, 'lower': 9.71, 'upper': 10.60}, ...]
+    engine = _load(*dataset_registry.file_version(path))
+    windows = engine.year_windows(starts)
+    slope, intercept = engine.fit(*windows)
+    half_width = engine.mean(*windows)[1]
+    level = predict(slope[0], intercept[0], [year])[:, 0]
+    return [
+        {
+            'start': int(start),
+            'slope': float(slope[0, i]),
+            'intercept': float(intercept[0, i]),
+            'year': year,
+            'level': float(level[i]),
+            'lower': float(level[i] - half_width[i]),
+            'upper': float(level[i] + half_width[i])
+        }
+        for i, start in enumerate(starts)
+    ]
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+# Regressão linear em lote por somas prefixadas
+#
+# Depois de uma preparação O(n) (somas acumuladas de w, x, y, xy e x²),
+# a reta de mínimos quadrados de qualquer janela [início, fim) sai em O(1):
+#   slope     = (n·Σxy − Σx·Σy) / (n·Σx² − (Σx)²)
+#   intercept = (Σy − slope·Σx) / n
+# e tudo é vetorizado: muitas janelas e muitas estações (séries) de uma vez.
+#
+# - x é centralizado antes das somas (evita perda de precisão com anos ~2000)
+# - valores ausentes (NaN) em y recebem peso 0, então cada estação pode ter lacunas
+
+class PrefixRegression:
+
+    def __init__(self, x, y):
+        # - x: array (n,) com os anos (ordenados)
+        # - y: array (n,) ou (estações, n) com as medições
+        self.x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.single = y.ndim == 1
+        y = np.atleast_2d(y)
+
+        self.x0 = self.x.mean()
+        xc = self.x - self.x0
+        w = ~np.isnan(y)
+        y = np.where(w, y, 0.0)
+
+        # Somas prefixadas com um zero no início: soma da janela [i, j) = S[j] − S[i]
+        def prefix(values):
+            return np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)], axis=-1)
+
+        self.sw = prefix(w.astype(np.float64))
+        self.sx = prefix(w * xc)
+        self.sy = prefix(y)
+        self.sxy = prefix(w * xc * y)
+        self.sxx = prefix(w * xc * xc)
+
+    def fit(self, start, stop):
+        # Retas das janelas [start, stop) (índices, escalares ou arrays)
+        # Retorna (slope, intercept), cada um com forma (estações, janelas)
+        # (ou só (janelas,) / escalar, se y tinha uma única série e as janelas eram escalares)
+        scalar = np.ndim(start) == 0 and np.ndim(stop) == 0
+        start, stop = np.broadcast_arrays(np.atleast_1d(start), np.atleast_1d(stop))
+
+        def window(s):
+            return s[:, stop] - s[:, start]
+
+        n, sx, sy, sxy, sxx = (window(s) for s in (self.sw, self.sx, self.sy, self.sxy, self.sxx))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+            intercept_c = (sy - slope * sx) / n
+
+        # Volta da origem centralizada para a original: y = intercept + slope·ano
+        intercept = intercept_c - slope * self.x0
+
+        if self.single:
+            slope, intercept = slope[0], intercept[0]
+        if scalar:
+            slope, intercept = slope[..., 0], intercept[..., 0]
+        return slope, intercept
+
+    def mean(self, start, stop):
+        # Média de y (ignorando NaN) em cada janela [start, stop), também em O(1)
+        scalar = np.ndim(start) == 0 and np.ndim(stop) == 0
+        start, stop = np.broadcast_arrays(np.atleast_1d(start), np.atleast_1d(stop))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = (self.sy[:, stop] - self.sy[:, start]) / (self.sw[:, stop] - self.sw[:, start])
+        if self.single:
+            mean = mean[0]
+        return mean[..., 0] if scalar else mean
+
+    def year_windows(self, start_years, end_year=None):
+        # Índices [start, stop) das janelas que vão de cada ano em "start_years"
+        # até "end_year" (inclusive; padrão: último ano)
+        start = np.searchsorted(self.x, np.asarray(start_years, dtype=np.float64), side='left')
+        stop = np.searchsorted(self.x, self.x[-1] if end_year is None else end_year, side='right')
+        return start, stop
+
+    def fit_from_years(self, start_years, end_year=None):
+        # Retas de cada ano inicial em "start_years" até "end_year" (inclusive; padrão: último ano)
+        return self.fit(*self.year_windows(start_years, end_year))
+
+    def all_start_years(self, min_points=2):
+        # Uma reta para cada ano inicial possível (até o fim da série), em uma única chamada
+        starts = np.arange(len(self.x) - min_points + 1)
+        slope, intercept = self.fit(starts, len(self.x))
+        return self.x[starts], slope, intercept
+
+
+def predict(slope, intercept, years):
+    # Valores previstos pelas retas nos anos indicados (por broadcasting)
+    return np.asarray(intercept)[..., None] + np.asarray(slope)[..., None] * np.asarray(years, dtype=np.float64)
@@ -1,52 +1,63 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.stats import linregress
+import os
+import sys
 
-def draw_plot():
-    # Lê os dados do arquivo CSV "epa-sea-level.csv" e armazena em um DataFrame do pandas
-    df = pd.read_csv('epa-sea-level.csv')
+import numpy as np
 
-    # Cria a figura (fig) e o eixo (ax) onde o gráfico será desenhado
-    # figsize define o tamanho da figura (10 de largura por 6 de altura)
-    fig, ax = plt.subplots(figsize=(10, 6))
+from prediction import DATA_FILE, FIT_STARTS, PROJECT_TO, fit_trends
+from regression import predict
 
-    # Cria um gráfico de dispersão (scatter plot) mostrando a relação entre o ano e o nível do mar
-    # Cada ponto representa uma medição feita em determinado ano
-    ax.scatter(df['Year'], df['CSIRO Adjusted Sea Level'])
+# Módulos compartilhados (common/): registro dos conjuntos de dados, pool de figuras
+# e instrumentação opcional das etapas
+_COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common')
+if _COMMON not in sys.path:
+    sys.path.append(_COMMON)
+import dataset_registry
+from figure_pool import DEFAULT_COMPRESS_LEVEL, FigurePool, FigureTemplate
+from instrumentation import stage, traced
 
-    # Calcula a primeira linha de tendência (regressão linear) com base em todos os dados disponíveis
-    # linregress retorna o coeficiente angular (slope), o intercepto e outros dados da regressão
-    res = linregress(df['Year'], df['CSIRO Adjusted Sea Level'])
+# O matplotlib só é importado dentro das funções que salvam a figura:
+# quem precisa apenas das previsões usa prediction.py e não paga esse custo
 
-    # Cria uma lista de anos de 1880 até 2050 (inclusive) para projetar a tendência até o futuro
-    years_extended = pd.Series([i for i in range(1880, 2051)])
+# Tamanho da figura (10 de largura por 6 de altura)
+FIGSIZE = (10, 6)
 
-    # Plota a linha de tendência com base na equação da reta: y = intercept + slope * x
-    # A linha é desenhada em vermelho ('r') e recebe um rótulo para a legenda
-    ax.plot(
-        years_extended,
-        res.intercept + res.slope * years_extended,
-        'r',
-        label='Linha de Ajuste (1880–2050)'
-    )
 
-    # Cria uma segunda análise de regressão, agora considerando apenas os dados a partir do ano 2000
-    # Isso permite comparar a tendência recente com a tendência histórica completa
-    df_2000 = df[df['Year'] >= 2000]
+@traced('sea_level.fits')
+def sea_level_fits(df, starts=FIT_STARTS):
+    # Calcula as duas regressões lineares (todos os dados e dados a partir de 2000)
+    # em uma única chamada vetorizada do motor de somas prefixadas (regression.py)
+    # Retorna arrays com o coeficiente angular (slope) e o intercepto de cada linha
+    slope, intercept = fit_trends(df['Year'], df['CSIRO Adjusted Sea Level'], starts)
+    return {'start': np.asarray(starts), 'slope': slope, 'intercept': intercept}
 
-    # Calcula a nova regressão linear apenas com os dados mais recentes
-    res_2000 = linregress(df_2000['Year'], df_2000['CSIRO Adjusted Sea Level'])
 
-    # Gera uma nova série de anos (de 2000 até 2050) para a projeção da segunda linha
-    years_extended_2000 = pd.Series([i for i in range(2000, 2051)])
+def _trend_lines(df):
+    # Anos (do ano inicial de cada ajuste até 2050) e níveis previstos pela equação da reta:
+    # y = intercept + slope * x
+    fits = sea_level_fits(df)
+    lines = []
+    for start, slope, intercept in zip(fits['start'], fits['slope'], fits['intercept']):
+        years_extended = np.arange(start, PROJECT_TO + 1)
+        lines.append((years_extended, predict(slope, intercept, years_extended)))
+    return lines
+
+
+@traced('sea_level.plot')
+def plot_sea_level(fig, df):
+    # Cria o eixo (ax) onde o gráfico será desenhado, em uma figura já criada
+    # (pyplot ou Figure do matplotlib)
+    ax = fig.subplots()
+
+    # Cria um gráfico de dispersão (scatter plot) mostrando a relação entre o ano e o nível do mar
+    # Cada ponto representa uma medição feita em determinado ano
+    ax.scatter(df['Year'], df['CSIRO Adjusted Sea Level'])
 
-    # Plota a nova linha de tendência (em verde) para os dados de 2000 em diante
-    ax.plot(
-        years_extended_2000,
-        res_2000.intercept + res_2000.slope * years_extended_2000,
-        'g',
-        label='Linha de Ajuste (2000–2050)'
-    )
+    # Desenha as linhas de tendência: a primeira com todos os dados disponíveis e a segunda
+    # apenas com os dados a partir do ano 2000, para comparar a tendência recente com a histórica
+    # Cada linha é projetada do seu ano inicial até 2050 (inclusive)
+    styles = [('r', 'Linha de Ajuste (1880–2050)'), ('g', 'Linha de Ajuste (2000–2050)')]
+    for (years_extended, levels), (color, label) in zip(_trend_lines(df), styles):
+        ax.plot(years_extended, levels, color, label=label)
 
     # Adiciona título e rótulos aos eixos do gráfico
     ax.set_xlabel('Year')                 # Eixo X: Anos
@@ -56,11 +67,79 @@ def draw_plot():
     # Exibe a legenda com as linhas identificadas (vermelha e verde)
     ax.legend()
 
+
+def draw_plot():
+    import matplotlib.pyplot as plt
+
+    # Lê os dados do arquivo CSV "epa-sea-level.csv" (pelo registro de conjuntos de dados,
+    # com as colunas mapeadas do cache em disco) e armazena em um DataFrame do pandas
+    df = dataset_registry.frame('sea_level', DATA_FILE)
+
+    # Cria a figura (fig) e desenha o gráfico nela
+    fig = plt.figure(figsize=FIGSIZE)
+    plot_sea_level(fig, df)
+
     # Salva o gráfico como imagem PNG no diretório atual
-    plt.savefig('sea_level_plot.png')
+    with stage('sea_level.savefig', figure='sea_level_plot'):
+        fig.savefig('sea_level_plot.png')
+
+    # Fecha a figura no pyplot (o eixo continua utilizável por quem o recebe),
+    # para que chamadas repetidas não acumulem figuras na memória
+    ax = fig.axes[0]
+    plt.close(fig)
 
     # Retorna o eixo do gráfico (ax) — útil para testes automatizados ou ajustes posteriores
-    return plt.gca()
+    return ax
+
+
+# Renderização rápida para relatórios repetidos (common/figure_pool.py)
+# A figura é montada uma vez; nas chamadas seguintes só os pontos e as
+# duas linhas de tendência mudam
+
+class SeaLevelTemplate(FigureTemplate):
+    figsize = FIGSIZE
+
+    def build(self, df):
+        plot_sea_level(self.figure, df)
+        self.ax = self.figure.axes[0]
+        self.points = self.ax.collections[0]
+        self.lines = self.ax.lines[:len(FIT_STARTS)]
+
+    def matches(self, df):
+        return True
+
+    def update(self, df):
+        points = np.column_stack([df['Year'], df['CSIRO Adjusted Sea Level']])
+        self.points.set_offsets(points)
+        for line, (years, levels) in zip(self.lines, _trend_lines(df)):
+            line.set_data(years, levels)
+
+        # relim ignora coleções (o scatter), então os pontos entram nos limites à parte
+        self.ax.relim()
+        self.ax.update_datalim(points[~np.isnan(points).any(axis=1)])
+        self.ax.autoscale_view()
+
+
+POOL = FigurePool()
+
+
+def render_png(df, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL, pool=POOL):
+    # PNG em memória do gráfico a partir de um DataFrame com as colunas do CSV
+    return pool.render('sea_level', SeaLevelTemplate, df, dpi, compress_level)
+
+
+# PNG em memória (bytes) do gráfico, sem passar pelo pyplot nem gravar em disco
+# Com um cache (common/result_cache.py), os bytes são reaproveitados enquanto
+# o CSV e o código não mudarem, sem ler nem analisar os dados novamente
+
+def figure_png(path=DATA_FILE, cache=None, dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    path = dataset_registry.locate(path)
+    if cache is not None:
+        return cache.memoize(figure_png, [path], path, dpi=dpi, compress_level=compress_level)
+
+    df = dataset_registry.frame('sea_level', path)
+    with stage('sea_level.savefig', figure='sea_level_plot'):
+        return render_png(df, dpi, compress_level)
 
 
 # Bloco principal — executado apenas se o arquivo for rodado diretamente (não importado como módulo)